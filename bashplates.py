@@ -20,66 +20,76 @@ from __future__ import annotations
 import atexit
 import os
 import readline
-import shutil
 import sys
 from enum import Enum
+from typing import TYPE_CHECKING
 
 from escape import Esc
+from lazy import LazyModule
+from terminal import sink, use_colour
+
+if TYPE_CHECKING:
+    from copier import CopyMode
 
 # Variables ------------------------------------------------------------------
 
+# Only loaded by the messages, copies and questions that use them
+copier = LazyModule("copier")
+metrics = LazyModule("metrics")
+query = LazyModule("query")
+
 
 # Code -----------------------------------------------------------------------
 class BpEsc:
     @staticmethod
     def fg_8bit_color(c: int) -> str:
-        return f"\x1b[38;5;{c}m"
+        return Esc.fg_8bit_color(c)
 
     @staticmethod
     def bg_8bit_color(c: int) -> str:
-        return f"\x1b[48;5;{c}m"
+        return Esc.bg_8bit_color(c)
 
 
 class Bp:
-    """ANSI foreground colors codes"""
-
-    E_BLACK = "\x1b[0;30m"  # Black
-    E_RED = "\x1b[0;31m"  # Red
-    E_GREEN = "\x1b[0;32m"  # Green
-    E_YELLOW = "\x1b[0;33m"  # Yellow
-    E_BLUE = "\x1b[0;34m"  # Blue
-    E_MAGENTA = "\x1b[0;35m"  # Magenta
-    E_CYAN = "\x1b[0;36m"  # Cyan
-    E_WHITE = "\x1b[0;37m"  # Gray
-    E_DARKGRAY = "\x1b[1;30m"  # Dark Gray
-    E_BR_RED = "\x1b[1;31m"  # Bright Red
-    E_BR_GREEN = "\x1b[1;32m"  # Bright Green
-    E_BR_YELLOW = "\x1b[1;33m"  # Bright Yellow
-    E_BR_BLUE = "\x1b[1;34m"  # Bright Blue
-    E_BR_MAGENTA = "\x1b[1;35m"  # Bright Magenta
-    E_BR_CYAN = "\x1b[1;36m"  # Bright Cyan
-    E_BR_WHITE = "\x1b[1;37m"  # White
+    """ANSI foreground colors codes, the same codes as Esc"""
+
+    E_BLACK = Esc.BLACK  # Black
+    E_RED = Esc.RED  # Red
+    E_GREEN = Esc.GREEN  # Green
+    E_YELLOW = Esc.YELLOW  # Yellow
+    E_BLUE = Esc.BLUE  # Blue
+    E_MAGENTA = Esc.MAGENTA  # Magenta
+    E_CYAN = Esc.CYAN  # Cyan
+    E_WHITE = Esc.GRAY  # Gray
+    E_DARKGRAY = Esc.DARKGRAY  # Dark Gray
+    E_BR_RED = Esc.BR_RED  # Bright Red
+    E_BR_GREEN = Esc.BR_GREEN  # Bright Green
+    E_BR_YELLOW = Esc.BR_YELLOW  # Bright Yellow
+    E_BR_BLUE = Esc.BR_BLUE  # Bright Blue
+    E_BR_MAGENTA = Esc.BR_MAGENTA  # Bright Magenta
+    E_BR_CYAN = Esc.BR_CYAN  # Bright Cyan
+    E_BR_WHITE = Esc.WHITE  # White
 
     # ANSI background color codes
     #
-    E_BG_BLACK = "\x1b[40m"  # Black
-    E_BG_RED = "\x1b[41m"  # Red
-    E_BG_GREEN = "\x1b[42m"  # Green
-    E_BG_YELLOW = "\x1b[43m"  # Yellow
-    E_BG_BLUE = "\x1b[44m"  # Blue
-    E_BG_MAGENTA = "\x1b[45m"  # Magenta
-    E_BG_CYAN = "\x1b[46m"  # Cyan
-    E_BG_WHITE = "\x1b[47m"  # White
+    E_BG_BLACK = Esc.ON_BLACK  # Black
+    E_BG_RED = Esc.ON_RED  # Red
+    E_BG_GREEN = Esc.ON_GREEN  # Green
+    E_BG_YELLOW = Esc.ON_YELLOW  # Yellow
+    E_BG_BLUE = Esc.ON_BLUE  # Blue
+    E_BG_MAGENTA = Esc.ON_MAGENTA  # Magenta
+    E_BG_CYAN = Esc.ON_CYAN  # Cyan
+    E_BG_WHITE = Esc.ON_WHITE  # White
 
     # ANSI Text attributes
     E_NORMAL = "\x1b[0m"  # Reset attributes
-    E_BOLD = "\x1b[1m"  # bold font
-    E_LOWINTENSITY = "\x1b[2m"  # Low intensity/faint/dim
+    E_BOLD = Esc.ATTR_BOLD  # bold font
+    E_LOWINTENSITY = Esc.ATTR_LOWI  # Low intensity/faint/dim
     E_ITALIC = "\x1b[3m"  # Low intensity/faint/dim
-    E_UNDERLINE = "\x1b[4m"  # Underline
-    E_SLOWBLINK = "\x1b[5m"  # Slow blink
+    E_UNDERLINE = Esc.ATTR_UNDERLINE  # Underline
+    E_SLOWBLINK = Esc.ATTR_BLINK  # Slow blink
     E_FASTBLINK = "\x1b[6m"  # Fast blink
-    E_REVERSE = "\x1b[7m"  # Reverse video
+    E_REVERSE = Esc.ATTR_REVERSE  # Reverse video
     E_CROSSED = "\x1b[9m"  # Crossed text
     E_FRACTUR = "\x1b[20m"  # Gothic
     E_FRAMED = "\x1b[51m"  # Framed
@@ -87,13 +97,19 @@ class Bp:
     E_SUPERSCRIPT = "\x1b[73m"  # Superscript
     E_SUBSCRIPT = "\x1b[74m"  # Subscript
 
-    E_RESET = "\x1b[m"
+    E_RESET = Esc.END
 
     C_QUERY: str = BpEsc.fg_8bit_color(194)
     C_QUERY_DEF: str = BpEsc.fg_8bit_color(240)
     C_EMPHASIS: str = BpEsc.fg_8bit_color(255)
     C_DEEMPHASIS: str = BpEsc.fg_8bit_color(250)
 
+    @staticmethod
+    def set_colour(enabled: bool) -> None:
+        """Use escape codes, or make all E_* and C_* codes empty"""
+        for name, code in _CODES.items():
+            setattr(Bp, name, code if enabled else "")
+
     @staticmethod
     def name() -> str:
         return os.getenv("BP_NAME", "")
@@ -112,14 +128,18 @@ class Bp:
 
     @staticmethod
     def msg(msg: str):
-        print(msg)
+        sink.write(msg)
 
     @staticmethod
     def msg_ok(msg: str):
+        if metrics.registry.enabled:
+            metrics.messages.inc(level="ok")
         Bp.msg(f"[Ok] {msg}")
 
     @staticmethod
     def msg_error(msg: str):
+        if metrics.registry.enabled:
+            metrics.messages.inc(level="error")
         Bp.msg(f"[Error] {msg}")
 
     @staticmethod
@@ -133,12 +153,39 @@ class Bp:
             return True
 
     @staticmethod
-    def cp(src: str, dst: str):
-        shutil.copyfile(src, dst)
+    def cp(src: str, dst: str, mode: CopyMode | None = None):
+        """Copy file, hardlink mode is for assets that are never modified"""
+        with metrics.timed(metrics.copy_seconds):
+            copier.copy_file(src, dst, copier.CopyMode.COPY if mode is None else mode)
+        if metrics.registry.enabled:
+            metrics.files_copied.inc()
         Bp.msg_ok(f"Copied file to {dst}.")
 
     @staticmethod
-    def read_string(question: str, default=None) -> str:
+    def cp_tree(src: str, dst: str, mode: CopyMode | None = None):
+        files, size = copier.copy_tree(src, dst, copier.CopyMode.COPY if mode is None else mode)
+        if metrics.registry.enabled:
+            metrics.files_copied.inc(files)
+        Bp.msg_ok(f"Copied {files} files ({size} bytes) to {dst}.")
+
+    @staticmethod
+    def read_string(question: str, default=None, qid: str | None = None) -> str:
+        return query.Query.answer(query.QueryType.STRING, question, default, qid,
+                                  lambda: Bp.ask_string(question, default))
+
+    @staticmethod
+    def read_integer(question: str, default=None, min=None, max=None,
+                     qid: str | None = None) -> int:
+        return query.Query.answer(query.QueryType.INTEGER, question, default, qid,
+                                  lambda: Bp.ask_integer(question, default, min, max))
+
+    @staticmethod
+    def read_bool(question: str, default=None, qid: str | None = None) -> bool:
+        return query.Query.answer(query.QueryType.BOOL, question, default, qid,
+                                  lambda: Bp.ask_bool(question, default))
+
+    @staticmethod
+    def ask_string(question: str, default=None) -> str:
         """Retrieve string input from user
 
         Args:
@@ -165,6 +212,7 @@ class Bp:
             else:
                 s = default
             # sys.stdout.write(question + f"[{s}]>")
+            sink.flush()  # Pending messages before the prompt
             choice = input(
                 f"{Bp.C_QUERY}{question}{Bp.E_RESET} {Bp.C_QUERY_DEF}[{Bp.E_RESET}{s}{Bp.C_QUERY_DEF}]{Bp.E_RESET} > "
             )
@@ -179,7 +227,7 @@ class Bp:
                 return choice
 
     @staticmethod
-    def read_integer(question: str, default=None, min=None, max=None) -> int:
+    def ask_integer(question: str, default=None, min=None, max=None) -> int:
         if default is not None:
             prompt = (
                 f"{Bp.C_QUERY_DEF}[{Bp.E_RESET}{default}{Bp.C_QUERY_DEF}]{Bp.E_RESET}"
@@ -198,6 +246,7 @@ class Bp:
         while True:
             choice = "aa"
             while True:
+                sink.flush()  # Pending messages before the prompt
                 choice = input(f"{Bp.C_QUERY}{question}{Bp.E_RESET} {prompt} > ")
                 if choice.isnumeric():
                     val = int(choice)
@@ -221,7 +270,7 @@ class Bp:
                 return default
 
     @staticmethod
-    def read_bool(question: str, default=None) -> bool:
+    def ask_bool(question: str, default=None) -> bool:
         valid_true = ["yes", "y", "ye"]
         valid_false = ["no", "n"]
 
@@ -237,6 +286,7 @@ class Bp:
         while True:
             # sys.stdout.write(f"{question} {prompt}")
             # choice = input().lower()
+            sink.flush()  # Pending messages before the prompt
             choice = input(f"{Bp.C_QUERY}{question}{Bp.E_RESET} {prompt} > ")
 
             if choice == "" and default is not None:
@@ -251,6 +301,12 @@ class Bp:
             sys.stdout.write("Please respond with 'yes' or 'no' (or 'y' or 'n').\n")
 
 
+# Escape codes of Bp, emptied by set_colour(False)
+_CODES = {name: getattr(Bp, name) for name in vars(Bp) if name.startswith(("E_", "C_"))}
+
+Bp.set_colour(use_colour())
+
+
 def main() -> None:
     print(f"Name: {Bp.name()}")
     print(f"Name: {Bp.email()}")
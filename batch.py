@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Batch generation of many files from a spec file, over a process pool
+#
+# File:     batch.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+import metrics
+import settings
+from manifest import Manifest
+from pytemplates import PyConf, PyGenerator, PyTemplate, select, template_sets
+from store import ContentStore
+from writer import Sync, writer
+
+# Variables ------------------------------------------------------------------
+
+ENTRY_KEYS = {"command", "conf", "toggles", "header"}
+
+# Fields missing in an entry default to these settings, like in PyConf.query
+SETTING_DEFAULTS = ("author", "email", "org", "project", "license")
+
+# Template library and settings of a worker process, set by init_worker()
+_library: Dict[str, PyTemplate] = {}
+_incremental = False
+_send_metrics = False  # Worker process, metrics are sent in results to the parent
+
+
+# Code -----------------------------------------------------------------------
+def load_spec(path: str) -> List[dict]:
+    """Entries of a JSON lines or TOML spec file
+
+    JSON lines files have one entry object per line, blank lines and lines
+    starting with # are skipped. TOML files have an [[entry]] table per
+    entry. An entry looks like:
+
+        {"command": "newa", "conf": {"name": "tool", "description": "A tool"},
+         "toggles": {"t_logging": false}, "header": "header.txt"}
+    """
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("TOML spec files need Python 3.11 or later") from None
+        with open(path, "rb") as file:
+            entries = tomllib.load(file).get("entry", [])
+    else:
+        entries = []
+        with open(path) as file:
+            for line_no, line in enumerate(file, 1):
+                line = line.strip()
+                if line == "" or line.startswith("#"):
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_no}: {e}") from None
+
+    for i, entry in enumerate(entries):
+        check_entry(i, entry)
+    return entries
+
+
+def check_entry(index: int, entry: dict) -> None:
+    if not isinstance(entry, dict):
+        raise ValueError(f"Entry {index}: expected an object")
+    unknown = entry.keys() - ENTRY_KEYS
+    if len(unknown) > 0:
+        raise ValueError(f"Entry {index}: unknown keys {', '.join(sorted(unknown))}")
+    if entry.get("command") not in template_sets:
+        raise ValueError(f"Entry {index}: unknown command '{entry.get('command')}', "
+                         f"expected one of {', '.join(template_sets)}")
+
+
+def make_conf(entry: dict) -> PyConf:
+    data = dict(entry.get("conf", {}))
+    defaults = settings.current()
+    for name in SETTING_DEFAULTS:
+        if name not in data and defaults.get(name) != "":
+            data[name] = defaults.get(name)
+    conf = PyConf.from_dict(data, strict=True)
+    if conf.out_dir == "":
+        conf.out_dir = "."
+    if conf.file_name == "":
+        conf.file_name = "__init__.py" if entry["command"] == "newpkg" else f"{conf.name}.py"
+    return conf
+
+
+def init_worker(library: Dict[str, PyTemplate], sync: Sync, incremental: bool,
+                store: ContentStore | None = None, send_metrics: bool = False) -> None:
+    global _incremental, _send_metrics
+    _library.update(library)
+    writer.sync = sync
+    writer.store = store
+    _incremental = incremental
+    _send_metrics = send_metrics
+    if send_metrics:
+        metrics.registry.enabled = True
+
+
+def run_entry(item: Tuple[int, dict]) -> dict:
+    """Generate and write one entry, errors are returned in the result
+
+    The file may still be pending, run_chunk() commits the files of all
+    its entries at once.
+    """
+    index, entry = item
+    result = {"index": index, "command": entry["command"], "file_name": "",
+              "ok": True, "skipped": False, "error": "", "seconds": 0.0}
+    start = time.perf_counter()
+    conf = None
+    try:
+        header_text = None
+        if entry.get("header") is not None:
+            with open(entry["header"]) as file:
+                header_text = file.read()
+
+        conf = make_conf(entry)
+        generator = PyGenerator(conf, select(_library, entry["command"],
+                                             entry.get("toggles", {}), header_text))
+        generator.generate()
+        os.makedirs(conf.out_dir, exist_ok=True)
+
+        skipped = Manifest.skipped
+        file_name = generator.write(incremental=_incremental)
+        result["file_name"] = file_name
+        result["skipped"] = Manifest.skipped > skipped
+
+        if _incremental:  # Recorded by the parent, worker manifests are never saved
+            manifest = Manifest.for_dir(os.path.dirname(file_name))
+            result["manifest"] = [manifest.dir, manifest.key(file_name),
+                                  manifest.entries.get(manifest.key(file_name))]
+    except Exception as e:
+        if conf is not None:  # Only the file of this entry
+            writer.abort(f"{conf.out_dir}/{conf.file_name}")
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = time.perf_counter() - start
+    if _send_metrics:
+        result["metrics"] = metrics.registry.drain()
+    return result
+
+
+def run_chunk(items: List[Tuple[int, dict]]) -> List[dict]:
+    """Generate entries and commit their files with one sync, see Sync.BATCH"""
+    results = [run_entry(item) for item in items]
+    try:
+        writer.commit()
+    except OSError as e:
+        writer.abort()
+        for result in results:
+            if result["ok"] and not result["skipped"]:
+                result["ok"] = False
+                result["error"] = f"{type(e).__name__}: {e}"
+                result.pop("manifest", None)
+    return results
+
+
+def merge_manifests(results: List[dict]) -> None:
+    """Record manifest entries written by worker processes"""
+    for result in results:
+        if not result["ok"] or "manifest" not in result:
+            continue
+        dir, key, entry = result["manifest"]
+        if result["skipped"]:
+            Manifest.skipped += 1
+        else:
+            Manifest.written += 1
+        if entry is not None:
+            manifest = Manifest.for_dir(dir)
+            manifest.entries[key] = entry
+            manifest.modified = True
+
+
+def run(entries: List[dict], library: Dict[str, PyTemplate], jobs: int = 1,
+        incremental: bool = False, sync: Sync = Sync.NEVER,
+        store: ContentStore | None = None) -> List[dict]:
+    """Generate all entries, with jobs worker processes if jobs > 1
+
+    Returns:
+        List[dict]: Result of each entry, in entry order
+    """
+    items = list(enumerate(entries))
+    if jobs <= 1:
+        init_worker(library, sync, incremental, store)
+        return run_chunk(items)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(items) // (jobs * 4))
+    chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(library, sync, incremental, store,
+                                       metrics.registry.enabled)) as pool:
+        results = []
+        for chunk_results in pool.map(run_chunk, chunks):
+            for result in chunk_results:
+                metrics.registry.merge(result.pop("metrics", {}))
+                results.append(result)
+    if incremental:
+        merge_manifests(results)
+    return results
+
+
+def summary(results: List[dict], seconds: float, jobs: int, slowest: int = 5) -> str:
+    failed = [r for r in results if not r["ok"]]
+    skipped = sum(1 for r in results if r["skipped"])
+    written = len(results) - len(failed) - skipped
+    rate = len(results) / seconds if seconds > 0 else 0.0
+
+    lines = [f"{len(results)} entries, {written} written, {skipped} skipped, "
+             f"{len(failed)} failed in {seconds:.2f} s "
+             f"({rate:.1f} entries/s, {jobs} jobs)."]
+
+    ok = sorted((r for r in results if r["ok"]), key=lambda r: r["seconds"], reverse=True)
+    if len(ok) > 0:
+        lines.append("Slowest entries:")
+        lines += [f"  {r['seconds']*1000:8.1f} ms  #{r['index']} {r['command']} {r['file_name']}"
+                  for r in ok[:slowest]]
+
+    if len(failed) > 0:
+        lines.append("Failed entries:")
+        lines += [f"  #{r['index']} {r['command']}: {r['error']}" for r in failed]
+
+    return "\n".join(lines)
+
+
+def write_report(file_name: str, results: List[dict], seconds: float, jobs: int) -> None:
+    """Per entry results and timings as JSON"""
+    report = {"jobs": jobs, "seconds": seconds,
+              "entries": [{k: v for k, v in r.items() if k != "manifest"}
+                          for r in results]}
+    with open(file_name, "w") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+
+
+def main() -> None:
+    import sys
+
+    import pytemplates
+
+    entries = load_spec(sys.argv[1])
+    start = time.perf_counter()
+    results = run(entries, pytemplates.library(), os.cpu_count() or 1)
+    print(summary(results, time.perf_counter() - start, os.cpu_count() or 1))
+
+
+if __name__ == "__main__":
+    main()
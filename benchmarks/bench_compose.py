@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Micro benchmark of merging many templates into one generator
+#
+# File:     bench_compose.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pytemplates import (SECTIONS, PyConf, PyGenerator, PyTemplate,  # noqa: E402
+                         Section, Sections)
+
+# Variables ------------------------------------------------------------------
+
+SIZES = [250, 500, 1000, 2000, 4000]
+
+# Size of code_text of each synthetic template, about the size of t_qt5
+CODE_SIZE = 4000
+
+
+# Code -----------------------------------------------------------------------
+def synthetic_templates(n: int) -> List[PyTemplate]:
+    code = ("x = 1  # __NAME__\n" * (CODE_SIZE // 19))
+    return [PyTemplate(imports_text=f"import mod{i}\n",
+                       code_text=code,
+                       main_func_text=f"    run{i}()\n") for i in range(n)]
+
+
+def concat_merge(templates: List[PyTemplate]) -> str:
+    """Reference, merge by appending to string fields"""
+    merged = PyTemplate()
+    for template in templates:
+        for name in SECTIONS:
+            setattr(merged, name, getattr(merged, name) + getattr(template, name))
+    return merged.code_text
+
+
+def fragment_merge(templates: List[PyTemplate]) -> str:
+    """Merge into fragment lists, joined once"""
+    sections = Sections()
+    for template in templates:
+        sections.add(template)
+    return sections.get(Section.CODE)
+
+
+def generate(templates: List[PyTemplate]) -> str:
+    conf = PyConf(name="bench")
+    generator = PyGenerator(conf, templates)
+    generator.generate()
+    return str(generator)
+
+
+def measure(func, templates: List[PyTemplate]) -> float:
+    start = time.perf_counter()
+    func(templates)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    funcs = [("concat", concat_merge), ("fragments", fragment_merge),
+             ("generate", generate)]
+    print(f"{'templates':>10}" + "".join(f" {name + ' [us/tpl]':>20}" for name, _ in funcs))
+    for n in SIZES:
+        templates = synthetic_templates(n)
+        times = [min(measure(func, templates) for _ in range(3)) for _, func in funcs]
+        print(f"{n:10}" + "".join(f" {t/n*1e6:20.1f}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
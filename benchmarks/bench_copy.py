@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Copy throughput of copier against shutil on large asset trees
+#
+# File:     bench_copy.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copier  # noqa: E402
+from copier import CopyMode, copy_tree  # noqa: E402
+
+# Variables ------------------------------------------------------------------
+
+# (name, directories, files per directory, file size)
+TREES = [
+    ("docs", 50, 40, 4 * 1024),
+    ("icons", 10, 200, 32 * 1024),
+    ("media", 4, 8, 16 * 1024 * 1024),
+]
+
+ROUNDS = 3
+
+
+# Code -----------------------------------------------------------------------
+def make_tree(root: str, dirs: int, files: int, size: int) -> int:
+    data = os.urandom(size)
+    for d in range(dirs):
+        dir = os.path.join(root, f"dir{d}")
+        os.makedirs(dir)
+        for f in range(files):
+            with open(os.path.join(dir, f"file{f}.dat"), "wb") as file:
+                file.write(data)
+    return dirs * files * size
+
+
+def measure(copy: Callable[[str, str], object], src: str, work: str) -> float:
+    """Best time of ROUNDS copies of src into a fresh directory"""
+    best = float("inf")
+    for i in range(ROUNDS):
+        dst = os.path.join(work, f"copy{i}")
+        start = time.perf_counter()
+        copy(src, dst)
+        best = min(best, time.perf_counter() - start)
+        shutil.rmtree(dst)
+    return best
+
+
+def run(name: str, dirs: int, files: int, size: int, work: str) -> Tuple[float, ...]:
+    src = os.path.join(work, name)
+    total = make_tree(src, dirs, files, size)
+    mb = total / (1024 * 1024)
+    return (mb,
+            mb / measure(shutil.copytree, src, work),
+            mb / measure(copy_tree, src, work),
+            mb / measure(lambda s, d: copy_tree(s, d, CopyMode.HARDLINK), src, work))
+
+
+def main() -> None:
+    work = tempfile.mkdtemp(prefix="bench_copy.", dir=sys.argv[1] if len(sys.argv) > 1 else None)
+    try:
+        print(f"{'tree':>6} {'files':>6} {'MB':>8} {'shutil [MB/s]':>14}"
+              f" {'copier [MB/s]':>14} {'hardlink [MB/s]':>16}")
+        for name, dirs, files, size in TREES:
+            mb, base, fast, link = run(name, dirs, files, size, work)
+            print(f"{name:>6} {dirs*files:6} {mb:8.1f} {base:14.1f} {fast:14.1f} {link:16.1f}")
+        print(f"Methods used: {copier.stats}")
+    finally:
+        shutil.rmtree(work)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Memory use and merge time of large template libraries
+#
+# File:     bench_templates.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import sys
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pytemplates import SECTIONS, PyTemplate  # noqa: E402
+
+# Variables ------------------------------------------------------------------
+
+SIZES = [1000, 5000, 20000]
+
+# Reference, the former dataclass layout with one field per section
+DictTemplate = dataclasses.make_dataclass(
+    "DictTemplate",
+    [("text", str, "")] + [(name, str, "") for name in SECTIONS] +
+    [("query_text", str, ""), ("do_query", bool, False), ("include", bool, True),
+     ("alt", list, dataclasses.field(default_factory=list)), ("key", str, "")])
+
+
+# Code -----------------------------------------------------------------------
+def dict_add(self, other) -> None:
+    for name in SECTIONS:
+        setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+def build(cls, n: int) -> List:
+    # Shared texts, like a real library where templates reuse literals
+    texts = {"imports_text": "import os\n", "code_text": "x = 1\n",
+             "main_func_text": "    pass\n"}
+    return [cls(key=f"t_{i}", **texts) for i in range(n)]
+
+
+def memory(cls, n: int) -> float:
+    """Bytes per template"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    library = build(cls, n)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del library
+    return (after - before) / n
+
+
+def merge_time(cls, add, n: int) -> float:
+    """Seconds per merged template"""
+    library = build(cls, n)
+    merged = cls()
+    start = time.perf_counter()
+    for template in library:
+        add(merged, template)
+    return (time.perf_counter() - start) / n
+
+
+def main() -> None:
+    print(f"{'templates':>10} {'dataclass [B/tpl]':>18} {'slotted [B/tpl]':>16}"
+          f" {'dataclass [us/add]':>19} {'slotted [us/add]':>17}")
+    for n in SIZES:
+        print(f"{n:10} {memory(DictTemplate, n):18.0f} {memory(PyTemplate, n):16.0f}"
+              f" {merge_time(DictTemplate, dict_add, n)*1e6:19.2f}"
+              f" {merge_time(PyTemplate, PyTemplate.add, n)*1e6:17.2f}")
+
+
+if __name__ == "__main__":
+    main()
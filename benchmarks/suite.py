@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Benchmark suite of the generator, writer and project paths, with history
+#
+# File:     suite.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytemplates  # noqa: E402
+from imports import Import  # noqa: E402
+from lazy import import_times  # noqa: E402
+from project import ProjectGenerator, load_assets  # noqa: E402
+from pytemplates import PyConf, PyGenerator, PyTemplate  # noqa: E402
+
+# Variables ------------------------------------------------------------------
+
+self_dir = os.path.dirname(os.path.abspath(__file__))
+
+HISTORY_FILE = f"{self_dir}/history.json"
+
+PPL = os.path.join(os.path.dirname(self_dir), "ppl")
+
+# Size of code_text of each synthetic template, in lines
+CODE_LINES = 40
+
+
+# Code -----------------------------------------------------------------------
+def synthetic_library(n: int) -> List[PyTemplate]:
+    """n templates with placeholders and imports, like a large user library"""
+    code = "".join(f"value_{j} = '__NAME__ __DESCRIPTION__'  # __AUTHOR__\n"
+                   for j in range(CODE_LINES))
+    return [PyTemplate(key=f"t_{i}",
+                       imports=[Import(f"mod{i % 50}", deferrable=i % 2 == 0)],
+                       code_text=f"# Template {i}\n{code}",
+                       main_func_text=f"    run_{i}()\n") for i in range(n)]
+
+
+def synthetic_confs(n: int) -> List[PyConf]:
+    return [PyConf(name=f"module_{i}", file_name=f"module_{i}.py",
+                   description=f"Synthetic module {i}", author="Bench Mark",
+                   email="bench@example.com", has_separators=i % 2 == 0,
+                   tokens={"VERSION": f"0.{i}"}) for i in range(n)]
+
+
+class Suite:
+    """Benchmark cases, each returns seconds per operation
+
+    Cases:
+        add       PyTemplate.add of every template into one
+        compile   generate() with the render plan cache cleared
+        render    generate() and full render of every configuration
+        write     PyGenerator.write of every configuration
+        copy      ProjectGenerator asset copies of a new project
+        git_init  Repository init and initial commit, plain backend
+        git_init_gitpython  The same with GitPython, when installed
+        import    Cold start import time of ppl --version
+    """
+
+    def __init__(self, templates: int, confs: int, projects: int, work: str) -> None:
+        self.library = synthetic_library(templates)
+        self.confs = synthetic_confs(confs)
+        self.projects = projects
+        self.work = work
+        self.assets = load_assets()
+        self.cases: Dict[str, Callable[[], float]] = {
+            "add": self.add,
+            "compile": self.compile,
+            "render": self.render,
+            "write": self.write,
+            "copy": self.copy,
+            "git_init": self.git_init,
+            "import": self.cold_import,
+        }
+        if importlib.util.find_spec("git") is not None:
+            self.cases["git_init_gitpython"] = self.git_init_gitpython
+
+    def add(self) -> float:
+        merged = PyTemplate()
+        start = time.perf_counter()
+        for template in self.library:
+            merged.add(template)
+        return (time.perf_counter() - start) / len(self.library)
+
+    def compile(self) -> float:
+        start = time.perf_counter()
+        for conf in self.confs[:10]:
+            pytemplates._compile.cache_clear()
+            PyGenerator(conf, self.library).generate()
+        return (time.perf_counter() - start) / min(10, len(self.confs))
+
+    def render(self) -> float:
+        start = time.perf_counter()
+        for conf in self.confs:
+            generator = PyGenerator(conf, self.library)
+            generator.generate()
+            "".join(generator.chunks())
+        return (time.perf_counter() - start) / len(self.confs)
+
+    def write(self) -> float:
+        dir = tempfile.mkdtemp(dir=self.work)
+        generators = []
+        for conf in self.confs:
+            generator = PyGenerator(conf, self.library)
+            generator.generate()
+            generators.append(generator)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for generator in generators:
+                generator.write(dir)
+        seconds = time.perf_counter() - start
+        shutil.rmtree(dir)
+        return seconds / len(generators)
+
+    def create_projects(self, backend: str) -> List[Dict[str, float]]:
+        """Timings of each created project"""
+        dir = tempfile.mkdtemp(dir=self.work)
+        timings = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(self.projects):
+                proj = ProjectGenerator(project_name=f"p{i}", project_dir=dir,
+                                        subdir_name=f"p{i}", git_backend=backend)
+                proj.create(self.assets)
+                proj.commit()
+                timings.append(proj.timings)
+        shutil.rmtree(dir)
+        return timings
+
+    def copy(self) -> float:
+        return statistics.fmean(t["copy"] for t in self.create_projects("plain"))
+
+    def git_init(self) -> float:
+        return statistics.fmean(t["git_init"] + t["commit"]
+                                for t in self.create_projects("plain"))
+
+    def git_init_gitpython(self) -> float:
+        return statistics.fmean(t["git_init"] + t["commit"]
+                                for t in self.create_projects("gitpython"))
+
+    def cold_import(self) -> float:
+        return sum(t[1] for t in import_times([PPL, "--version"])) / 1e6
+
+    def run(self, names: List[str], rounds: int) -> Dict[str, float]:
+        """Best of rounds of each case"""
+        return {name: min(self.cases[name]() for _ in range(rounds)) for name in names}
+
+
+def load_history(path: str) -> List[dict]:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return []
+
+
+def save_history(path: str, history: List[dict]) -> None:
+    tmp_name = f"{path}.tmp"
+    with open(tmp_name, "w") as file:
+        json.dump(history, file, indent=1)
+        file.write("\n")
+    os.replace(tmp_name, path)
+
+
+def baseline(history: List[dict], params: dict, window: int) -> Dict[str, float]:
+    """Median of each case over the last window runs with the same parameters"""
+    runs = [run for run in history if run["params"] == params][-window:]
+    cases: Dict[str, List[float]] = {}
+    for run in runs:
+        for name, seconds in run["results"].items():
+            cases.setdefault(name, []).append(seconds)
+    return {name: statistics.median(values) for name, values in cases.items()}
+
+
+def report(results: Dict[str, float], base: Dict[str, float],
+           threshold: float) -> List[str]:
+    """Print results against the baseline, returns regressed cases"""
+    regressions = []
+    print(f"{'case':20} {'time [us]':>12} {'baseline [us]':>14} {'change':>8}")
+    for name, seconds in results.items():
+        if name not in base:
+            print(f"{name:20} {seconds*1e6:12.1f} {'-':>14} {'-':>8}")
+            continue
+        change = seconds / base[name] - 1.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:20} {seconds*1e6:12.1f} {base[name]*1e6:14.1f} {change*100:7.1f}%{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark suite of pyplate, fails on "
+                                                 "regressions against the recorded history")
+    parser.add_argument("cases", nargs="*", help="Cases to run, all if none",
+                        metavar="CASE")
+    parser.add_argument("--templates", type=int, default=200,
+                        help="Templates in the synthetic library", metavar="N")
+    parser.add_argument("--confs", type=int, default=200,
+                        help="Synthetic configurations rendered and written", metavar="N")
+    parser.add_argument("--projects", type=int, default=20,
+                        help="Projects created by copy and git cases", metavar="N")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Rounds of each case, the best is kept", metavar="N")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline, 0.25 is 25%%",
+                        metavar="FRACTION")
+    parser.add_argument("--window", type=int, default=5,
+                        help="Runs of history the baseline is the median of", metavar="N")
+    parser.add_argument("--history", type=str, default=HISTORY_FILE,
+                        help="JSON history file", metavar="FILE")
+    parser.add_argument("--no-save", action="store_true", default=False,
+                        help="Do not add this run to the history")
+    parser.add_argument("--dir", type=str, default=None,
+                        help="Directory for written files and projects", metavar="DIR")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_suite.", dir=args.dir)
+    try:
+        suite = Suite(args.templates, args.confs, args.projects, work)
+        unknown = set(args.cases) - suite.cases.keys()
+        if len(unknown) > 0:
+            parser.error(f"unknown cases {', '.join(sorted(unknown))}, "
+                         f"expected {', '.join(suite.cases)}")
+        results = suite.run(args.cases or list(suite.cases), args.rounds)
+    finally:
+        shutil.rmtree(work)
+
+    params = {"templates": args.templates, "confs": args.confs, "projects": args.projects,
+              "python": platform.python_version()}
+    history = load_history(args.history)
+    regressions = report(results, baseline(history, params, args.window), args.threshold)
+
+    if not args.no_save:
+        history.append({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "params": params,
+                        "results": results})
+        save_history(args.history, history)
+
+    if len(regressions) > 0:
+        print(f"\nRegressions over {args.threshold*100:.0f}%: {', '.join(regressions)}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
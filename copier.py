@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# File copy engine using in-kernel copies, reflinks and hardlinks
+#
+# File:     copier.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import sys
+from enum import Enum
+from typing import Dict, Set, Tuple
+
+# Variables ------------------------------------------------------------------
+
+# ioctl(dst, FICLONE, src) shares all extents of src, Linux btrfs/xfs/bcachefs
+FICLONE = 0x40049409
+
+CHUNK = 1 << 30
+
+# Errors meaning a method is not supported for these files, try the next one
+UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY,
+               errno.EINVAL, errno.EBADF, errno.EPERM}
+
+# Methods found unsupported, by (src device, dst device)
+_unsupported: Dict[Tuple[int, int], Set[str]] = {}
+
+# Files copied by each method
+stats: Dict[str, int] = {}
+
+
+# Code -----------------------------------------------------------------------
+class CopyMode(Enum):
+    COPY = "copy"  # Fastest available copy, reflink if the filesystem can
+    HARDLINK = "hardlink"  # Link instead of copy, for read-only assets only
+
+
+def _reflink(src_fd: int, dst_fd: int) -> None:
+    import fcntl
+
+    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int) -> None:
+    while os.copy_file_range(src_fd, dst_fd, CHUNK) > 0:
+        pass
+
+
+def _sendfile(src_fd: int, dst_fd: int) -> None:
+    offset = 0
+    while True:
+        sent = os.sendfile(dst_fd, src_fd, offset, CHUNK)
+        if sent == 0:
+            break
+        offset += sent
+
+
+# In order of preference, the first one that works is used
+METHODS = [("reflink", _reflink)] if sys.platform == "linux" else []
+if hasattr(os, "copy_file_range"):
+    METHODS.append(("copy_file_range", _copy_file_range))
+if hasattr(os, "sendfile") and sys.platform == "linux":
+    METHODS.append(("sendfile", _sendfile))
+
+
+def _count(method: str) -> str:
+    stats[method] = stats.get(method, 0) + 1
+    return method
+
+
+def copy_file(src: str, dst: str, mode: CopyMode = CopyMode.COPY,
+              st: os.stat_result | None = None) -> str:
+    """Copy contents of src to dst, like shutil.copyfile
+
+    Returns:
+        str: Method used, reflink, copy_file_range, sendfile, read or
+        hardlink
+    """
+    if mode == CopyMode.HARDLINK:
+        try:
+            if os.path.lexists(dst):
+                os.unlink(dst)
+            os.link(src, dst)
+            return _count("hardlink")
+        except OSError as e:
+            if e.errno not in UNSUPPORTED and e.errno != errno.EMLINK:
+                raise
+
+    with open(src, "rb") as fsrc:
+        if st is None:
+            st = os.fstat(fsrc.fileno())
+        with open(dst, "wb") as fdst:
+            key = (st.st_dev, os.fstat(fdst.fileno()).st_dev)
+            unsupported = _unsupported.setdefault(key, set())
+            for name, method in METHODS:
+                if name in unsupported:
+                    continue
+                try:
+                    method(fsrc.fileno(), fdst.fileno())
+                    return _count(name)
+                except OSError as e:
+                    if e.errno not in UNSUPPORTED:
+                        raise
+                    unsupported.add(name)
+                    fdst.seek(0)
+                    fdst.truncate()
+                    os.lseek(fsrc.fileno(), 0, os.SEEK_SET)
+
+            shutil.copyfileobj(fsrc, fdst)
+            return _count("read")
+
+
+def copy_tree(src: str, dst: str, mode: CopyMode = CopyMode.COPY) -> Tuple[int, int]:
+    """Copy a directory tree, each directory read by a single os.scandir
+
+    File permissions are kept, symbolic links are recreated as links.
+
+    Returns:
+        Tuple[int, int]: Files and bytes copied
+    """
+    files = 0
+    size = 0
+    stack = [(src, dst)]
+    while len(stack) > 0:
+        src_dir, dst_dir = stack.pop()
+        os.makedirs(dst_dir, exist_ok=True)
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                target = os.path.join(dst_dir, entry.name)
+                if entry.is_symlink():
+                    if os.path.lexists(target):
+                        os.unlink(target)
+                    os.symlink(os.readlink(entry.path), target)
+                elif entry.is_dir():
+                    stack.append((entry.path, target))
+                else:
+                    st = entry.stat()
+                    if copy_file(entry.path, target, mode, st) != "hardlink":
+                        os.chmod(target, st.st_mode & 0o7777)
+                    files += 1
+                    size += st.st_size
+    return files, size
+
+
+def main() -> None:
+    copy_tree(sys.argv[1], sys.argv[2])
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
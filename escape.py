@@ -24,6 +24,9 @@
 #
 #
 
+from terminal import BG_256, FG_256
+
+
 class Esc:
     """ ANSI foreground colors codes """
     
@@ -71,3 +74,13 @@ class Esc:
     BACK = '\033[D'             # Move cursor backward
     HIDE = '\033[?25l'          # Hide cursor
     END = '\033[m'              # Clear Attributes
+
+    @staticmethod
+    def fg_8bit_color(c: int) -> str:
+        """256 colour foreground, from the table in terminal"""
+        return FG_256[c]
+
+    @staticmethod
+    def bg_8bit_color(c: int) -> str:
+        """256 colour background, from the table in terminal"""
+        return BG_256[c]
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Git repository backends for project creation
+#
+# File:     gitbackend.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import hashlib
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+import settings
+from lazy import LazyModule
+
+# Variables ------------------------------------------------------------------
+
+# GitPython is only imported when its backend is used
+git_repo = LazyModule("git.repo", "python3-git")
+
+BACKENDS = ("gitpython", "plain")
+
+# GitPython changes the working directory of the process while adding files
+_gitpython_lock = threading.Lock()
+
+DEFAULT_BRANCH = "master"
+
+CONFIG = """\
+[core]
+\trepositoryformatversion = 0
+\tfilemode = true
+\tbare = false
+\tlogallrefupdates = true
+"""
+
+
+# Code -----------------------------------------------------------------------
+class GitBackend(ABC):
+    """Repository of a new project
+
+    Files are collected by add() and only put in the index by commit(),
+    which writes the index once and commits in one step.
+    """
+
+    def __init__(self, dir: str) -> None:
+        self.dir = os.path.abspath(dir)
+        self.files: List[str] = []
+
+    @abstractmethod
+    def init(self) -> None:
+        pass
+
+    def add(self, file: str) -> None:
+        path = os.path.relpath(os.path.abspath(file), self.dir)
+        if path not in self.files:
+            self.files.append(path)
+
+    @abstractmethod
+    def commit(self, message: str) -> str:
+        """Add collected files and commit, returns the commit id"""
+
+
+class GitPythonBackend(GitBackend):
+    """GitPython repository, with one index update for all files
+
+    Commits of different repositories are serialized, GitPython changes
+    the working directory of the whole process during index.add().
+    """
+
+    def init(self) -> None:
+        self.repo = git_repo.Repo.init(self.dir)
+
+    def commit(self, message: str) -> str:
+        with _gitpython_lock:
+            if len(self.files) > 0:
+                self.repo.index.add([os.path.join(self.dir, f) for f in self.files])
+                self.files = []
+            return self.repo.index.commit(message).hexsha
+
+
+class PlainBackend(GitBackend):
+    """Writes loose objects, index and branch ref directly, without git
+
+    Only writes the initial commit of a new repository. Author and committer
+    come from the GIT_AUTHOR_*/GIT_COMMITTER_* environment variables or the
+    author and email settings.
+    """
+
+    def init(self) -> None:
+        self.git_dir = os.path.join(self.dir, ".git")
+        for sub in ["objects/info", "objects/pack", "refs/heads", "refs/tags", "info"]:
+            os.makedirs(os.path.join(self.git_dir, sub), exist_ok=True)
+        for name, text in [("HEAD", f"ref: refs/heads/{DEFAULT_BRANCH}\n"),
+                           ("config", CONFIG),
+                           ("description", "Unnamed repository; edit this file "
+                                           "'description' to name the repository.\n")]:
+            path = os.path.join(self.git_dir, name)
+            if not os.path.exists(path):
+                with open(path, "w") as file:
+                    file.write(text)
+
+    def write_object(self, type: str, data: bytes) -> bytes:
+        """Store a loose object, returns its binary id"""
+        raw = f"{type} {len(data)}\0".encode() + data
+        sha = hashlib.sha1(raw)
+        hex = sha.hexdigest()
+        path = os.path.join(self.git_dir, "objects", hex[:2], hex[2:])
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_name = f"{path}.tmp"
+            with open(tmp_name, "wb") as file:
+                file.write(zlib.compress(raw))
+            os.chmod(tmp_name, 0o444)
+            os.replace(tmp_name, path)
+        return sha.digest()
+
+    def write_tree(self, entries: Dict[str, Tuple[int, bytes]], prefix: str = "") -> bytes:
+        """Tree object of all entries below prefix, subtrees written first"""
+        items: List[Tuple[bytes, bytes, bytes]] = []  # sort key, mode, id
+        subdirs = set()
+        for path, (mode, sha) in entries.items():
+            if not path.startswith(prefix):
+                continue
+            name, sep, _ = path[len(prefix):].partition("/")
+            if sep == "":
+                items.append((name.encode(), f"{mode:o}".encode(), sha))
+            elif name not in subdirs:
+                subdirs.add(name)
+                sub = self.write_tree(entries, f"{prefix}{name}/")
+                items.append((name.encode() + b"/", b"40000", sub))
+
+        data = b"".join(mode + b" " + key.rstrip(b"/") + b"\0" + sha
+                        for key, mode, sha in sorted(items))
+        return self.write_object("tree", data)
+
+    @staticmethod
+    def index_entry(path: str, st: os.stat_result, mode: int, sha: bytes) -> bytes:
+        name = path.encode()
+        entry = struct.pack(">10I20sH",
+                            int(st.st_ctime) & 0xFFFFFFFF, st.st_ctime_ns % 1000000000,
+                            int(st.st_mtime) & 0xFFFFFFFF, st.st_mtime_ns % 1000000000,
+                            st.st_dev & 0xFFFFFFFF, st.st_ino & 0xFFFFFFFF, mode,
+                            st.st_uid, st.st_gid, st.st_size & 0xFFFFFFFF,
+                            sha, min(len(name), 0xFFF)) + name
+        return entry + b"\0" * (8 - len(entry) % 8)
+
+    def write_index(self, stats: Dict[str, Tuple[os.stat_result, int, bytes]]) -> None:
+        """Version 2 index of the committed files, so the work tree is clean"""
+        data = b"DIRC" + struct.pack(">II", 2, len(stats))
+        for path in sorted(stats, key=lambda p: p.encode()):
+            data += self.index_entry(path, *stats[path])
+        data += hashlib.sha1(data).digest()
+        tmp_name = os.path.join(self.git_dir, "index.lock")
+        with open(tmp_name, "wb") as file:
+            file.write(data)
+        os.replace(tmp_name, os.path.join(self.git_dir, "index"))
+
+    @staticmethod
+    def identity(role: str) -> str:
+        defaults = settings.current()
+        name = (os.getenv(f"GIT_{role}_NAME") or defaults.get("author").strip()
+                or os.getenv("USER", "pyplate"))
+        email = (os.getenv(f"GIT_{role}_EMAIL") or defaults.get("email")
+                 or f"{os.getenv('USER', 'pyplate')}@{socket.gethostname()}")
+        now = time.time()
+        offset = time.localtime(now).tm_gmtoff // 60
+        tz = f"{'+' if offset >= 0 else '-'}{abs(offset) // 60:02d}{abs(offset) % 60:02d}"
+        return f"{name} <{email}> {int(now)} {tz}"
+
+    def commit(self, message: str) -> str:
+        ref = os.path.join(self.git_dir, "refs", "heads", DEFAULT_BRANCH)
+        if os.path.exists(ref):
+            raise RuntimeError(f"{self.dir} already has commits, plain backend "
+                               "only writes the initial commit")
+
+        entries: Dict[str, Tuple[int, bytes]] = {}
+        stats: Dict[str, Tuple[os.stat_result, int, bytes]] = {}
+        for path in self.files:
+            full = os.path.join(self.dir, path)
+            st = os.stat(full)
+            mode = 0o100755 if st.st_mode & 0o100 else 0o100644
+            with open(full, "rb") as file:
+                sha = self.write_object("blob", file.read())
+            key = path.replace(os.sep, "/")
+            entries[key] = (mode, sha)
+            stats[key] = (st, mode, sha)
+        self.files = []
+
+        lines = [f"tree {self.write_tree(entries).hex()}",
+                 f"author {self.identity('AUTHOR')}",
+                 f"committer {self.identity('COMMITTER')}"]
+        commit = self.write_object("commit", ("\n".join(lines) + f"\n\n{message}\n").encode()).hex()
+
+        self.write_index(stats)
+        with open(f"{ref}.lock", "w") as file:
+            file.write(commit + "\n")
+        os.replace(f"{ref}.lock", ref)
+        return commit
+
+
+def open_backend(name: str, dir: str) -> GitBackend:
+    """Backend by name, one of BACKENDS"""
+    if name == "plain":
+        return PlainBackend(dir)
+    if name == "gitpython":
+        return GitPythonBackend(dir)
+    raise ValueError(f"Unknown git backend '{name}', expected one of {', '.join(BACKENDS)}")
+
+
+def main() -> None:
+    import sys
+    import tempfile
+
+    dir = tempfile.mkdtemp()
+    with open(os.path.join(dir, "README.md"), "w") as file:
+        file.write("# Test\n")
+    repo = open_backend(sys.argv[1] if len(sys.argv) > 1 else "plain", dir)
+    repo.init()
+    repo.add(os.path.join(dir, "README.md"))
+    print(dir, repo.commit("Initial commit"))
+
+
+if __name__ == "__main__":
+    main()
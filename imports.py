@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Structured imports of generated code, merged, sorted and formatted
+#
+# File:     imports.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Variables ------------------------------------------------------------------
+
+LINE_LENGTH = 79
+
+# Standard library modules used by templates, for Python < 3.10 where
+# sys.stdlib_module_names is missing
+STDLIB_FALLBACK = {
+    "abc", "argparse", "array", "ast", "asyncio", "atexit", "base64", "bisect",
+    "calendar", "collections", "concurrent", "configparser", "contextlib", "copy",
+    "csv", "ctypes", "dataclasses", "datetime", "decimal", "difflib", "email",
+    "enum", "errno", "fnmatch", "fractions", "functools", "gc", "getopt",
+    "getpass", "glob", "gzip", "hashlib", "heapq", "hmac", "html", "http",
+    "importlib", "inspect", "io", "ipaddress", "itertools", "json", "locale",
+    "logging", "lzma", "math", "mimetypes", "multiprocessing", "numbers",
+    "operator", "os", "pathlib", "pickle", "platform", "pprint", "queue",
+    "random", "re", "readline", "secrets", "select", "selectors", "shlex",
+    "shutil", "signal", "socket", "sqlite3", "ssl", "stat", "statistics",
+    "string", "struct", "subprocess", "sys", "tarfile", "tempfile", "textwrap",
+    "threading", "time", "timeit", "tkinter", "token", "tokenize", "traceback",
+    "types", "typing", "unittest", "urllib", "uuid", "warnings", "weakref",
+    "xml", "zipfile", "zlib",
+}
+
+STDLIB: Set[str] = set(getattr(sys, "stdlib_module_names", STDLIB_FALLBACK)) | {"__future__"}
+
+
+# Code -----------------------------------------------------------------------
+@dataclass(frozen=True)
+class Import:
+    """One import of a template
+
+    Args:
+        module (str): Module name
+        names (Tuple[str, ...]): Names for 'from module import names', empty
+            for 'import module'
+        deferrable (bool): Module is only used inside main() and may be
+            imported there instead of at module load
+    """
+    module: str
+    names: Tuple[str, ...] = ()
+    deferrable: bool = False
+
+    def is_stdlib(self) -> bool:
+        return self.module.split(".")[0] in STDLIB
+
+
+def name_key(name: str) -> Tuple[int, str]:
+    """Constants, then classes, then functions, like isort"""
+    if name.isupper() and len(name) > 1:
+        return (0, name)
+    if name[0].isupper():
+        return (1, name.lower())
+    return (2, name.lower())
+
+
+def format_from(module: str, names: List[str], indent: str = "") -> str:
+    line = f"{indent}from {module} import {', '.join(names)}"
+    if len(line) <= LINE_LENGTH:
+        return line + "\n"
+
+    # Wrap in parentheses, aligned after the opening one
+    start = f"{indent}from {module} import ("
+    lines = []
+    current = start
+    for i, name in enumerate(names):
+        item = name + (")" if i == len(names) - 1 else ",")
+        if current != start and not current.endswith("(") and \
+                len(current) + 1 + len(item) > LINE_LENGTH:
+            lines.append(current)
+            current = " " * len(start) + item
+        else:
+            current += item if current.endswith("(") else " " + item
+    lines.append(current)
+    return "\n".join(lines) + "\n"
+
+
+def format_imports(imports: Iterable[Import], indent: str = "") -> str:
+    """Merged, deduplicated and sorted import statements
+
+    Standard library imports come first, then third party imports, each
+    group with plain imports before from imports.
+    """
+    modules: Set[str] = set()
+    names: Dict[str, Set[str]] = {}
+    for imp in imports:
+        if len(imp.names) == 0:
+            modules.add(imp.module)
+        else:
+            names.setdefault(imp.module, set()).update(imp.names)
+
+    groups = []
+    for stdlib in [True, False]:
+        lines = [f"{indent}import {m}\n" for m in sorted(modules, key=str.lower)
+                 if Import(m).is_stdlib() == stdlib]
+        lines += [format_from(m, sorted(names[m], key=name_key), indent)
+                  for m in sorted(names, key=str.lower) if Import(m).is_stdlib() == stdlib]
+        if len(lines) > 0:
+            groups.append("".join(lines))
+
+    return "\n".join(groups)
+
+
+def split_imports(imports: Iterable[Import], defer: bool) -> Tuple[List[Import], List[Import]]:
+    """Split into (module level, function local) imports
+
+    A module imported both deferrable and not deferrable stays at module
+    level. Names of a deferrable from import are split one by one, so a
+    name only used in main() is imported there even if other names of the
+    module are imported at module level.
+    """
+    imports = list(imports)
+    if not defer:
+        return imports, []
+
+    eager = {imp.module for imp in imports if not imp.deferrable}
+    eager_names = {(imp.module, name) for imp in imports if not imp.deferrable
+                   for name in imp.names}
+    module_level = []
+    local = []
+    for imp in imports:
+        if not imp.deferrable:
+            module_level.append(imp)
+        elif len(imp.names) > 0:
+            names = tuple(n for n in imp.names if (imp.module, n) not in eager_names)
+            if len(names) > 0:
+                local.append(Import(imp.module, names, deferrable=True))
+        elif imp.module in eager:
+            module_level.append(imp)
+        else:
+            local.append(imp)
+    return module_level, local
+
+
+def main() -> None:
+    imports = [Import("sys"), Import("os"), Import("argparse", deferrable=True),
+               Import("os"), Import("PyQt5.QtCore", ("Qt", "QTimer")),
+               Import("PyQt5.QtCore", ("QSettings",)),
+               Import("PyQt5.QtWidgets", ("QApplication",), deferrable=True)]
+    print(format_imports(imports))
+    module_level, local = split_imports(imports, defer=True)
+    print(format_imports(module_level))
+    print(format_imports(local, "    "))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Lazy import layer and startup import time report
+#
+# File:     lazy.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Variables ------------------------------------------------------------------
+
+# Seconds spent importing each lazily loaded module
+load_times: Dict[str, float] = {}
+
+
+# Code -----------------------------------------------------------------------
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str, package: str = "") -> None:
+        self._name = name
+        self._package = package
+        self._module = None
+
+    def _load(self):
+        if self._module is not None:
+            return self._module
+
+        start = time.perf_counter()
+        try:
+            # __import__ and not importlib, so -X importtime reports the module
+            __import__(self._name)
+            self._module = sys.modules[self._name]
+        except ModuleNotFoundError:
+            if self._package == "":
+                raise
+            print(f"\nYou need library '{self._package}' to run this program.")
+            print("\nTo install:")
+            print(f">sudo apt install {self._package}\n")
+            exit(0)
+
+        load_times[self._name] = time.perf_counter() - start
+        return self._module
+
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded() else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def import_times(argv: List[str]) -> List[Tuple[str, int, int]]:
+    """Run argv in a fresh interpreter with -X importtime
+
+    Standard input is empty, questions must be answered by --answers or
+    --defaults.
+
+    Args:
+        argv (List[str]): Script and arguments to run
+
+    Returns:
+        List[Tuple[str, int, int]]: (module, self us, cumulative us) per module
+    """
+    import subprocess
+
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + argv,
+                          stdin=subprocess.DEVNULL,
+                          stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE,
+                          text=True)
+    result = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Column header
+        result.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return result
+
+
+def startup_report(script: str, argv: List[str], top: int = 25) -> None:
+    """Print per module import time of a cold start of script"""
+    times = import_times([script] + argv)
+    total = sum(t[1] for t in times)
+
+    print(f"Cold start import time for: {' '.join([script] + argv)}\n")
+    print(f"{'self [ms]':>10} {'cumul [ms]':>11}  module")
+    for name, self_us, cumulative_us in sorted(times, key=lambda t: t[2],
+                                               reverse=True)[:top]:
+        print(f"{self_us/1000:10.2f} {cumulative_us/1000:11.2f}  {name}")
+    print(f"\n{len(times)} modules imported in {total/1000:.2f} ms")
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print("Usage: lazy.py SCRIPT [ARGS...]")
+        exit(1)
+    startup_report(sys.argv[1], sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
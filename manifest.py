@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Output manifest for incremental regeneration
+#
+# File:     manifest.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable
+
+# Variables ------------------------------------------------------------------
+
+MANIFEST_FILE = ".pyplate-manifest.json"
+MANIFEST_VERSION = 1
+
+
+# Code -----------------------------------------------------------------------
+def digest(data: str | bytes) -> str:
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest_chunks(chunks: Iterable[str]) -> str:
+    """Same as digest() of the joined chunks, without joining them"""
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(chunk.encode())
+    return h.hexdigest()
+
+
+class Manifest:
+    """Record of generated files in one directory
+
+    For every file the hash of the template set, of the configuration and of
+    the written output is kept, together with mtime and size of the file.
+    A file is up to date when its inputs are unchanged and the file on disk
+    is still the one that was written.
+    """
+
+    # Open manifests by directory, and counters for the whole run
+    manifests: Dict[str, Manifest] = {}
+    written = 0
+    skipped = 0
+
+    def __init__(self, dir: str) -> None:
+        self.dir = os.path.abspath(dir)
+        self.file_name = os.path.join(self.dir, MANIFEST_FILE)
+        self.entries: Dict[str, dict] = {}
+        self.modified = False
+        self.load()
+
+    @staticmethod
+    def for_dir(dir: str) -> Manifest:
+        dir = os.path.abspath(dir)
+        if dir not in Manifest.manifests:
+            Manifest.manifests[dir] = Manifest(dir)
+        return Manifest.manifests[dir]
+
+    def load(self) -> None:
+        try:
+            with open(self.file_name) as file:
+                data = json.load(file)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data["files"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, AttributeError) as e:
+            logging.warning(f"Ignoring broken manifest {self.file_name}: {e}")
+
+    def save(self) -> None:
+        if not self.modified:
+            return
+        tmp_name = f"{self.file_name}.tmp"
+        with open(tmp_name, "w") as file:
+            json.dump({"version": MANIFEST_VERSION, "files": self.entries},
+                      file, indent=2, sort_keys=True)
+            file.write("\n")
+        os.replace(tmp_name, self.file_name)
+        self.modified = False
+
+    def key(self, file_name: str) -> str:
+        return os.path.relpath(os.path.abspath(file_name), self.dir)
+
+    def on_disk(self, file_name: str, entry: dict) -> bool:
+        """True if file is still the one recorded in entry"""
+        try:
+            st = os.stat(file_name)
+        except FileNotFoundError:
+            return False
+
+        if [st.st_mtime_ns, st.st_size] == entry["stat"]:
+            return True
+
+        with open(file_name, "rb") as file:
+            return digest(file.read()) == entry["output"]
+
+    def is_current(self, file_name: str, templates: str, conf: str,
+                   output: str) -> bool:
+        """Check if writing output to file_name can be skipped
+
+        Args:
+            file_name (str): Generated file
+            templates (str): Hash of the template set
+            conf (str): Hash of the configuration
+            output (str): Hash of the rendered output
+
+        Returns:
+            bool: True if inputs or output are unchanged and file is intact
+        """
+        entry = self.entries.get(self.key(file_name))
+        if entry is None:
+            return False
+
+        same_inputs = entry["templates"] == templates and entry["conf"] == conf
+        if not same_inputs and entry["output"] != output:
+            return False
+
+        if not self.on_disk(file_name, entry):
+            return False
+
+        if not same_inputs:  # Same output from new inputs
+            entry["templates"] = templates
+            entry["conf"] = conf
+            self.modified = True
+        return True
+
+    def record(self, file_name: str, templates: str, conf: str, output: str,
+               st: os.stat_result | None = None) -> None:
+        if st is None:
+            st = os.stat(file_name)
+        self.entries[self.key(file_name)] = {
+            "templates": templates,
+            "conf": conf,
+            "output": output,
+            "stat": [st.st_mtime_ns, st.st_size],
+        }
+        self.modified = True
+
+    @staticmethod
+    def save_all() -> None:
+        for manifest in Manifest.manifests.values():
+            manifest.save()
+
+    @staticmethod
+    def summary() -> str:
+        return f"{Manifest.written} files written, {Manifest.skipped} unchanged files skipped."
+
+
+def main() -> None:
+    manifest = Manifest(".")
+    for name, entry in sorted(manifest.entries.items()):
+        print(f"{name:30} {entry['output'][:12]}")
+
+
+if __name__ == "__main__":
+    main()
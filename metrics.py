@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Counters and latency histograms of generator runs, OpenMetrics/JSON export
+#
+# File:     metrics.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Dict, Iterator, List, Tuple
+
+# Variables ------------------------------------------------------------------
+
+PREFIX = "ppl"
+
+# Upper bounds in seconds, from a cached render to a GitPython commit
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+# Code -----------------------------------------------------------------------
+class Format(Enum):
+    OPENMETRICS = "openmetrics"  # Text exposition, the file is replaced by each export
+    JSONL = "jsonl"  # One snapshot per line, appended by each export
+
+
+def _labels(labels: Labels) -> str:
+    if len(labels) == 0:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, lock: threading.RLock | None = None) -> None:
+        self.name = name
+        self.help = help
+        self.lock = threading.RLock() if lock is None else lock
+        self.values: Dict[Labels, float] = {}
+
+    def clear(self) -> None:
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self) -> dict:
+        return {"type": "counter",
+                "values": [[dict(k), v] for k, v in self.values.items()]}
+
+    def merge(self, data: dict) -> None:
+        for labels, value in data["values"]:
+            self.inc(value, **labels)
+
+    def exposition(self) -> List[str]:
+        lines = [f"# TYPE {self.name} counter", f"# HELP {self.name} {self.help}"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}_total{_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = BUCKETS,
+                 lock: threading.RLock | None = None) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.lock = threading.RLock() if lock is None else lock
+        self.clear()
+
+    def clear(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)  # Last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def snapshot(self) -> dict:
+        return {"type": "histogram", "buckets": list(self.buckets),
+                "counts": list(self.counts), "sum": self.sum}
+
+    def merge(self, data: dict) -> None:
+        with self.lock:
+            for i, count in enumerate(data["counts"]):
+                self.counts[i] += count
+            self.sum += data["sum"]
+
+    def exposition(self) -> List[str]:
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.help}"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{self.name}_count {cumulative}")
+        lines.append(f"{self.name}_sum {self.sum}")
+        return lines
+
+
+class Registry:
+    """All metrics of a process
+
+    Metrics are only updated when enabled, hooks check enabled first.
+    Updates, exports and merges all take lock, the daemon updates metrics
+    from several threads. Worker processes send their drain() snapshots to the main process,
+    which merge()s them, so a pool run exports the totals of all workers.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.lock = threading.RLock()  # Held by merge() while it updates
+        self.metrics: Dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self.metrics.setdefault(name, Counter(f"{PREFIX}_{name}", help, lock=self.lock))
+
+    def histogram(self, name: str, help: str) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(f"{PREFIX}_{name}", help,
+                                                       lock=self.lock))
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self.lock:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def reset(self) -> None:
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.clear()
+
+    def drain(self) -> Dict[str, dict]:
+        """Snapshot and reset, for sending to the main process"""
+        data = self.snapshot()
+        self.reset()
+        return data
+
+    def merge(self, data: Dict[str, dict]) -> None:
+        with self.lock:
+            for name, metric in data.items():
+                if name in self.metrics:
+                    self.metrics[name].merge(metric)
+
+    def openmetrics(self) -> str:
+        with self.lock:
+            lines = [line for metric in self.metrics.values() for line in metric.exposition()]
+        return "\n".join(lines + ["# EOF"]) + "\n"
+
+    def export(self, file_name: str, format: Format) -> None:
+        if format == Format.JSONL:
+            line = json.dumps({"time": time.time(), "metrics": self.snapshot()})
+            with open(file_name, "a") as file:
+                file.write(line + "\n")
+            return
+
+        tmp_name = f"{file_name}.tmp"
+        with open(tmp_name, "w") as file:
+            file.write(self.openmetrics())
+        os.replace(tmp_name, file_name)
+
+
+class Exporter:
+    """Exports the registry every interval seconds from a thread, and at stop()"""
+
+    def __init__(self, registry: Registry, file_name: str, format: Format,
+                 interval: float = 0.0) -> None:
+        self.registry = registry
+        self.file_name = file_name
+        self.format = format
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.registry.enabled = True
+        if self.interval > 0:
+            self.thread = threading.Thread(target=self.run, name="metrics", daemon=True)
+            self.thread.start()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.registry.export(self.file_name, self.format)
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.registry.export(self.file_name, self.format)
+
+
+@contextmanager
+def timed(histogram: Histogram) -> Iterator[None]:
+    """Observe the time of the block in histogram, if metrics are enabled"""
+    if not registry.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+# Metrics of a ppl run
+registry = Registry()
+
+files_rendered = registry.counter("files_rendered", "Files rendered by PyGenerator")
+bytes_written = registry.counter("bytes_written", "Bytes of generated files written")
+templates_merged = registry.counter("templates_merged", "Templates merged into generated files")
+placeholders = registry.counter("placeholders_substituted", "Placeholders substituted")
+files_copied = registry.counter("files_copied", "Project assets and files copied")
+messages = registry.counter("messages", "Bp messages, by level")
+render_seconds = registry.histogram("render_seconds", "Time of PyGenerator.generate")
+write_seconds = registry.histogram("write_seconds", "Time to render and write a file")
+copy_seconds = registry.histogram("copy_seconds", "Time to copy one file")
+commit_seconds = registry.histogram("commit_seconds", "Time of project git commits")
+
+
+def main() -> None:
+    registry.enabled = True
+    files_rendered.inc()
+    messages.inc(level="ok")
+    render_seconds.observe(0.003)
+    print(registry.openmetrics(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# asyncio generation pipeline, with a synchronous facade
+#
+# File:     pipeline.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from batch import make_conf
+from manifest import Manifest
+from project import ProjectGenerator
+from pytemplates import PyConf, PyGenerator, PyTemplate, select
+from writer import writer
+
+# Code -----------------------------------------------------------------------
+
+
+class Pipeline:
+    """Generation, file writes, asset copies and git operations as tasks
+
+    Rendering runs in the event loop, everything blocking is offloaded to a
+    thread pool. At most concurrency blocking operations run at a time, so
+    any number of generations can be started in one event loop.
+    """
+
+    def __init__(self, library: Dict[str, PyTemplate], concurrency: int = 8,
+                 assets: Dict[str, bytes] | None = None) -> None:
+        self.library = library
+        self.concurrency = concurrency
+        self.assets = assets
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.limit: asyncio.Semaphore | None = None  # Created in the running loop
+        self.lock = threading.Lock()  # Manifests are shared by all threads
+
+    async def __aenter__(self) -> Pipeline:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+    async def blocking(self, func: Callable, *args):
+        """Run func(*args) in the thread pool, within the concurrency limit"""
+        if self.limit is None:
+            self.limit = asyncio.Semaphore(self.concurrency)
+        async with self.limit:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def render(self, command: str, conf: PyConf, toggles: Dict[str, bool] | None = None,
+                     header_text: str | None = None) -> PyGenerator:
+        generator = PyGenerator(conf, select(self.library, command, toggles or {}, header_text))
+        generator.generate()  # Plans are cached, rendering is done while writing
+        return generator
+
+    def _write_incremental(self, generator: PyGenerator, dir: str | None) -> Tuple[str, bool]:
+        """Write if changed, returns the file name and if it was skipped"""
+        with self.lock:
+            skipped = Manifest.skipped
+            file_name = generator.write(dir, incremental=True)
+            return file_name, Manifest.skipped > skipped
+
+    async def write(self, generator: PyGenerator, dir: str | None = None,
+                    incremental: bool = False) -> str:
+        if incremental:
+            return (await self.blocking(self._write_incremental, generator, dir))[0]
+        return await self.blocking(generator.write, dir)
+
+    async def create_project(self, proj: ProjectGenerator,
+                             generators: Sequence[PyGenerator] = ()) -> List[str]:
+        """Create project with generated files, assets and writes run concurrently
+
+        Returns:
+            List[str]: Files of the initial commit
+        """
+        await self.blocking(proj.make_dir)
+        await self.blocking(proj.init_repo)
+
+        copies = proj.asset_copies()
+        written = await asyncio.gather(
+            *[self.blocking(proj.copy_asset, name, dst, self.assets) for name, dst in copies],
+            *[self.write(generator, proj.project_dir) for generator in generators])
+        files = [dst for _, dst in copies] + list(written[len(copies):])
+
+        await self.blocking(writer.commit)  # Pending files in place before git reads them
+        for file in files:
+            proj.git_add(file)
+        await self.blocking(proj.commit)
+        return files
+
+    async def generate(self, command: str, conf: PyConf, toggles: Dict[str, bool] | None = None,
+                       header_text: str | None = None, incremental: bool = False,
+                       project: ProjectGenerator | None = None) -> str:
+        """Render and write one file, in a new project if project is given"""
+        generator = await self.render(command, conf, toggles, header_text)
+        if project is not None:
+            return (await self.create_project(project, [generator]))[-1]
+        await self.blocking(os.makedirs, conf.out_dir, 0o777, True)
+        return await self.write(generator, incremental=incremental)
+
+    async def _read(self, file_name: str) -> str:
+        def read() -> str:
+            with open(file_name) as file:
+                return file.read()
+        return await self.blocking(read)
+
+    async def generate_entry(self, entry: dict, incremental: bool = False) -> str:
+        """Generate one entry in the format of batch spec files"""
+        header_text = None
+        if entry.get("header") is not None:
+            header_text = await self._read(entry["header"])
+        return await self.generate(entry["command"], make_conf(entry),
+                                   entry.get("toggles"), header_text, incremental)
+
+    async def generate_all(self, entries: Iterable[dict],
+                           incremental: bool = False) -> List[str | BaseException]:
+        """Generate all entries concurrently
+
+        Returns:
+            List[str | BaseException]: File name, or the error, of each entry
+        """
+        return await asyncio.gather(*[self.generate_entry(entry, incremental)
+                                      for entry in entries], return_exceptions=True)
+
+    async def run_entry(self, index: int, entry: dict, incremental: bool = False) -> dict:
+        """Generate one entry, errors are returned in a result like batch.run_entry()"""
+        result = {"index": index, "command": entry["command"], "file_name": "",
+                  "ok": True, "skipped": False, "error": "", "seconds": 0.0}
+        start = time.perf_counter()
+        try:
+            header_text = None
+            if entry.get("header") is not None:
+                header_text = await self._read(entry["header"])
+            conf = make_conf(entry)
+            generator = await self.render(entry["command"], conf, entry.get("toggles"),
+                                          header_text)
+            await self.blocking(os.makedirs, conf.out_dir, 0o777, True)
+            if incremental:
+                result["file_name"], result["skipped"] = await self.blocking(
+                    self._write_incremental, generator, None)
+            else:
+                result["file_name"] = await self.blocking(generator.write)
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    async def run(self, entries: Iterable[dict], incremental: bool = False) -> List[dict]:
+        """Generate all entries concurrently, results in entry order"""
+        return await asyncio.gather(*[self.run_entry(index, entry, incremental)
+                                      for index, entry in enumerate(entries)])
+
+
+def _run_sync(library: Dict[str, PyTemplate], concurrency: int, incremental: bool,
+              func: Callable[[Pipeline], Awaitable]):
+    """Run func(pipeline) to completion, then commit the written files and
+    save the manifests"""
+    async def run():
+        async with Pipeline(library, concurrency) as pipeline:
+            return await func(pipeline)
+
+    try:
+        results = asyncio.run(run())
+    except BaseException:
+        writer.abort()
+        raise
+    writer.commit()
+    if incremental:
+        Manifest.save_all()
+    return results
+
+
+def generate_all(library: Dict[str, PyTemplate], entries: Iterable[dict],
+                 concurrency: int = 8, incremental: bool = False) -> List[str | BaseException]:
+    """Synchronous facade of Pipeline.generate_all() for callers without a loop"""
+    return _run_sync(library, concurrency, incremental,
+                     lambda pipeline: pipeline.generate_all(entries, incremental))
+
+
+def run(entries: List[dict], library: Dict[str, PyTemplate], concurrency: int = 8,
+        incremental: bool = False) -> List[dict]:
+    """Synchronous facade of Pipeline.run(), like batch.run() in one process
+
+    Returns:
+        List[dict]: Result of each entry, in entry order
+    """
+    return _run_sync(library, concurrency, incremental,
+                     lambda pipeline: pipeline.run(entries, incremental))
+
+
+def main() -> None:
+    import sys
+
+    import pytemplates
+    from batch import load_spec, summary
+
+    start = time.perf_counter()
+    results = run(load_spec(sys.argv[1]), pytemplates.library())
+    print(summary(results, time.perf_counter() - start, 8))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Single pass substitution of __TOKEN__ placeholders
+#
+# File:     placeholders.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Dict, List, Set, Tuple
+
+# Variables ------------------------------------------------------------------
+
+# Upper case names only, python dunders like __main__ are left alone
+TOKEN_RE = re.compile(r"__([A-Z][A-Z0-9]*(?:_[A-Z0-9]+)*)__")
+
+
+# Code -----------------------------------------------------------------------
+def substitute(text: str, mapping: Dict[str, str]) -> Tuple[str, Set[str]]:
+    """Replace all __TOKEN__ placeholders in one scan of text
+
+    Args:
+        text (str): Text with placeholders
+        mapping (Dict[str, str]): Replacement by token name, without underscores
+
+    Returns:
+        Tuple[str, Set[str]]: New text and names of tokens missing in mapping,
+        these are left untouched in the text.
+    """
+    unresolved: Set[str] = set()
+
+    def replace(match: re.Match) -> str:
+        value = mapping.get(match.group(1))
+        if value is None:
+            unresolved.add(match.group(1))
+            return match.group(0)
+        return value
+
+    return TOKEN_RE.sub(replace, text), unresolved
+
+
+class RenderPlan:
+    """Compiled text, literal segments with placeholder slots in between
+
+    The text is split into named parts once; rendering for a new set of
+    placeholder values is a single fill of the slots.
+    """
+
+    __slots__ = ("parts", "_digest")
+
+    def __init__(self, chunks: List[Tuple[str, str]]) -> None:
+        parts = []
+        for name, text in chunks:
+            split = TOKEN_RE.split(text)
+            parts.append((name, tuple(split[0::2]), tuple(split[1::2])))
+        self.parts: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...] = tuple(parts)
+        self._digest = ""
+
+    def render_part(self, index: int, mapping: Dict[str, str],
+                    unresolved: Set[str] | None = None) -> str:
+        """Render one part, placeholders missing in mapping are kept and
+        added to unresolved if given"""
+        _, literals, slots = self.parts[index]
+        out = [literals[0]]
+        for slot, literal in zip(slots, literals[1:]):
+            value = mapping.get(slot)
+            if value is None:
+                if unresolved is not None:
+                    unresolved.add(slot)
+                value = f"__{slot}__"
+            out.append(value)
+            out.append(literal)
+        return "".join(out)
+
+    def render(self, mapping: Dict[str, str]) -> Tuple[str, Set[str]]:
+        """Same result as substitute() applied to each chunk"""
+        unresolved: Set[str] = set()
+        text = "".join(self.render_part(i, mapping, unresolved)
+                       for i in range(len(self.parts)))
+        return text, unresolved
+
+    def digest(self) -> str:
+        """Hash identifying the compiled text"""
+        if self._digest == "":
+            self._digest = hashlib.sha256(repr(self.parts).encode()).hexdigest()
+        return self._digest
+
+    def names(self) -> List[str]:
+        return [part[0] for part in self.parts]
+
+    def substituted(self, mapping: Dict[str, str]) -> int:
+        """Number of slots filled from mapping in a render"""
+        return sum(1 for part in self.parts for slot in part[2] if slot in mapping)
+
+    def tokens(self) -> Set[str]:
+        return {slot for part in self.parts for slot in part[2]}
+
+
+def find(text: str) -> List[str]:
+    """Names of all placeholders in text, in order of appearance"""
+    return TOKEN_RE.findall(text)
+
+
+def parse_token(arg: str) -> Tuple[str, str]:
+    """Parse a NAME=VALUE command line token definition"""
+    name, sep, value = arg.partition("=")
+    name = name.strip("_").upper()
+    if sep == "" or TOKEN_RE.fullmatch(f"__{name}__") is None:
+        raise ValueError(f"Invalid token definition '{arg}', expected NAME=VALUE")
+    return name, value
+
+
+def main() -> None:
+    text = "# __NAME__ by __AUTHOR__ __UNKNOWN__, if __name__ == '__main__'"
+    print(substitute(text, {"NAME": "test", "AUTHOR": "me"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Per phase wall and CPU time of ppl runs
+#
+# File:     profiler.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+# Variables ------------------------------------------------------------------
+
+# Phases that wait for the user, reported apart from compute time
+WAIT_PHASES = {"query_wait"}
+
+
+# Code -----------------------------------------------------------------------
+class Phase:
+    __slots__ = ("count", "wall", "cpu", "self_wall", "self_cpu")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.wall = 0.0  # Including nested phases
+        self.cpu = 0.0
+        self.self_wall = 0.0  # Excluding nested phases
+        self.self_cpu = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Profiler:
+    """Wall and CPU time of named phases, hooked into the generators and Query
+
+    Phases may nest, the self times of a phase exclude the phases nested
+    in it, so time spent waiting for answers inside generate() is only
+    counted as query_wait. CPU time is the thread CPU time. Phases are
+    recorded per thread and summed, a profiler may be shared by threads.
+    Disabled, phase() does nothing.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.phases: Dict[str, Phase] = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+
+    def add(self, name: str, wall: float, cpu: float,
+            self_wall: float | None = None, self_cpu: float | None = None) -> None:
+        with self.lock:
+            phase = self.phases.setdefault(name, Phase())
+            phase.count += 1
+            phase.wall += wall
+            phase.cpu += cpu
+            phase.self_wall += wall if self_wall is None else self_wall
+            phase.self_cpu += cpu if self_cpu is None else self_cpu
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        stack: List[List[float]] = self.local.__dict__.setdefault("stack", [])
+        frame = [0.0, 0.0]  # Wall and CPU of nested phases
+        stack.append(frame)
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            stack.pop()
+            if len(stack) > 0:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+            self.add(name, wall, cpu, wall - frame[0], cpu - frame[1])
+
+    def record_startup(self) -> None:
+        """Add interpreter start and imports before enable() as phase startup"""
+        cpu = time.process_time()
+        wall = process_age()
+        self.add("startup", cpu if wall is None else wall, cpu)
+
+    def results(self) -> Dict[str, object]:
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        wait = sum(p.self_wall for n, p in self.phases.items() if n in WAIT_PHASES)
+        return {"wall": wall,
+                "cpu": cpu,
+                "query_wait": wait,
+                "compute_wall": wall - wait,
+                "phases": {name: phase.as_dict() for name, phase in self.phases.items()}}
+
+    def save(self, file_name: str) -> None:
+        with open(file_name, "w") as file:
+            json.dump(self.results(), file, indent=2)
+            file.write("\n")
+
+    def summary(self) -> str:
+        results = self.results()
+        lines = [f"{'Phase':18} {'calls':>6} {'wall ms':>10} {'cpu ms':>10}"
+                 f" {'self wall ms':>13} {'self cpu ms':>12}"]
+        for name, phase in sorted(self.phases.items(), key=lambda p: -p[1].self_wall):
+            lines.append(f"{name:18} {phase.count:6} {phase.wall*1000:10.2f} "
+                         f"{phase.cpu*1000:10.2f} {phase.self_wall*1000:13.2f} "
+                         f"{phase.self_cpu*1000:12.2f}")
+        lines.append(f"Total {results['wall']*1000:.2f} ms wall, {results['cpu']*1000:.2f} ms cpu, "
+                     f"{results['query_wait']*1000:.2f} ms waiting for answers, "
+                     f"{results['compute_wall']*1000:.2f} ms compute.")
+        return "\n".join(lines)
+
+
+def process_age() -> float | None:
+    """Seconds since this process started, None where unknown"""
+    try:
+        with open("/proc/self/stat") as file:
+            start_ticks = int(file.read().rpartition(")")[2].split()[19])
+        with open("/proc/uptime") as file:
+            uptime = float(file.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+# Shared profiler of a ppl run
+profiler = Profiler()
+
+
+def main() -> None:
+    profiler.enable()
+    profiler.record_startup()
+    with profiler.phase("outer"):
+        with profiler.phase("query_wait"):
+            time.sleep(0.05)
+        sum(range(1000000))
+    print(profiler.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -17,17 +17,36 @@
 from __future__ import annotations
 
 import os
-import sys
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
 
-from git import Repo
-
+import metrics
+import questions
 from bashplates import Bp
+from gitbackend import open_backend
+from profiler import profiler
+from query import QuerySequence
+from questions import PROJECT_DEFAULTS
+from writer import writer
 
 # Absolute path to script itself
-self_dir = os.path.abspath(os.path.dirname(sys.argv[0]))
+self_dir = os.path.abspath(os.path.dirname(__file__))
 template_dir = f"{self_dir}/pyplate"
 
+# Files of template_dir copied into new projects
+ASSETS = ("README.md", "HISTORY.md", "gitignore")
+
+
+def load_assets(dir: str = template_dir) -> Dict[str, bytes]:
+    """Contents of all project assets, read once for many projects"""
+    assets = {}
+    for name in ASSETS:
+        with open(f"{dir}/{name}", "rb") as file:
+            assets[name] = file.read()
+    return assets
+
 
 @dataclass
 class ProjectGenerator:
@@ -39,65 +58,96 @@ class ProjectGenerator:
     project_name: str = ""
     project_dir: str = ""
     subdir_name: str = ""
+    git_backend: str = "gitpython"  # One of gitbackend.BACKENDS
 
-    def query(self):
-        self.project_dir = os.getcwd()
-        self.project_name = Bp.read_string("Project name?", self.project_name)
-        self.create_subdir = Bp.read_bool(
-            "Create subdirectory?", default=self.create_subdir
-        )
-        if self.create_subdir:
-            self.subdir_name = Bp.read_string(
-                "Name of subdirectory?", default=self.project_name
-            )
+    # Seconds spent in each phase of create() and commit()
+    timings: Dict[str, float] = field(default_factory=dict)
 
-        self.create_git = Bp.read_bool(
-            "Initiate git repository?", default=self.create_git
-        )
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            with profiler.phase(f"project_{name}"):
+                yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
 
-        if self.create_git:
-            self.create_gitignore = Bp.read_bool(
-                "Create .gitignore?", default=self.create_gitignore
-            )
-            self.create_readme = Bp.read_bool(
-                "Create README.md?", default=self.create_readme
-            )
-            self.create_history = Bp.read_bool(
-                "Create HISTORY.md?", default=self.create_history
-            )
+    def queries(self) -> QuerySequence:
+        return questions.project_queries(
+            self.project_name, {attr: getattr(self, attr) for attr in PROJECT_DEFAULTS})
+
+    def query_attr(self):
+        self.project_dir = os.getcwd()
+        for attr, value in questions.project_fields(self.queries().run()).items():
+            setattr(self, attr, value)
 
     def git_add(self, file: str) -> None:
+        """Add file to the initial commit, the index is written by commit()"""
         if self.create_git:
-            self.repo.index.add(file)
-
-    def create(self):
+            self.repo.add(file)
+
+    def copy_asset(self, name: str, dst: str, assets: Dict[str, bytes] | None) -> None:
+        if assets is None and writer.store is None:
+            Bp.cp(f"{template_dir}/{name}", dst)
+            return
+
+        with metrics.timed(metrics.copy_seconds):
+            if assets is None:
+                with open(f"{template_dir}/{name}", "rb") as file:
+                    data = file.read()
+            else:
+                data = assets[name]
+            if writer.store is not None:
+                writer.store.materialize(data, dst)
+            else:
+                with open(dst, "wb") as file:
+                    file.write(data)
+        if metrics.registry.enabled:
+            metrics.files_copied.inc()
+
+    def make_dir(self) -> None:
         if self.create_subdir:
             self.project_dir = f"{self.project_dir}/{self.subdir_name}"
-            if not Bp.mkdir(self.project_dir):
-                exit()
-
-        f_readme = f"{self.project_dir}/README.md"
-        f_history = f"{self.project_dir}/HISTORY.md"
-        f_gitignore = f"{self.project_dir}/.gitignore"
+            with self.phase("mkdir"):
+                if not Bp.mkdir(self.project_dir):
+                    exit()
 
+    def init_repo(self) -> None:
         if self.create_git:
-            self.repo = Repo.init(self.project_dir)
+            with self.phase("git_init"):
+                self.repo = open_backend(self.git_backend, self.project_dir)
+                self.repo.init()
 
+    def asset_copies(self) -> List[Tuple[str, str]]:
+        """(asset name, destination) of all assets to copy"""
+        copies = []
+        if self.create_git:
             if self.create_readme:
-                Bp.cp(f"{template_dir}/README.md", f_readme)
-                self.git_add(f_readme)
-
+                copies.append(("README.md", f"{self.project_dir}/README.md"))
             if self.create_history:
-                Bp.cp(f"{template_dir}/HISTORY.md", f_history)
-                self.git_add(f_history)
-
+                copies.append(("HISTORY.md", f"{self.project_dir}/HISTORY.md"))
             if self.create_gitignore:
-                Bp.cp(f"{template_dir}/gitignore", f_gitignore)
-                self.git_add(f_gitignore)
+                copies.append(("gitignore", f"{self.project_dir}/.gitignore"))
+        return copies
+
+    def create(self, assets: Dict[str, bytes] | None = None):
+        """Create project directory, repository and files
+
+        Args:
+            assets (Dict[str, bytes], optional): Preloaded load_assets(),
+            files are copied from template_dir if None.
+        """
+        self.make_dir()
+        self.init_repo()
+        with self.phase("copy"):
+            for name, dst in self.asset_copies():
+                self.copy_asset(name, dst, assets)
+                self.git_add(dst)
 
     def commit(self):
         if self.create_git:
-            self.repo.index.commit("Initial commit")
+            with self.phase("commit"), metrics.timed(metrics.commit_seconds):
+                self.repo.commit("Initial commit")
 
 
 def main() -> None:
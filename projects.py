@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Creation of many projects at once, over a process pool
+#
+# File:     projects.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import csv
+import os
+import time
+from dataclasses import fields
+from typing import Dict, List, Tuple
+
+import metrics
+from project import ProjectGenerator, load_assets
+from query import QueryType, convert
+from store import ContentStore
+from terminal import Progress, sink
+from writer import writer
+
+# Variables ------------------------------------------------------------------
+
+PHASES = ("mkdir", "git_init", "copy", "commit")
+
+# Project assets of a worker process, set by init_worker()
+_assets: Dict[str, bytes] = {}
+_send_metrics = False  # Worker process, metrics are sent in results to the parent
+
+
+# Code -----------------------------------------------------------------------
+def load_csv(path: str, git_backend: str = "gitpython") -> List[ProjectGenerator]:
+    """Projects of a CSV file with a header of ProjectGenerator field names
+
+    project_name is required. project_dir defaults to the current directory,
+    subdir_name to project_name and git_backend to the given one. Missing
+    create_* columns or empty cells keep their default, True.
+    """
+    names = {f.name: f for f in fields(ProjectGenerator) if f.name != "timings"}
+    projects = []
+    with open(path, newline="") as file:
+        reader = csv.DictReader(file)
+        unknown = set(reader.fieldnames or []) - names.keys()
+        if len(unknown) > 0:
+            raise ValueError(f"{path}: unknown columns {', '.join(sorted(unknown))}")
+
+        for line_no, row in enumerate(reader, 2):
+            values = {k: v.strip() for k, v in row.items() if v is not None and v.strip() != ""}
+            if "project_name" not in values:
+                raise ValueError(f"{path}:{line_no}: project_name missing")
+            try:
+                for k, v in values.items():
+                    if names[k].type in ("bool", bool):
+                        values[k] = convert(QueryType.BOOL, v)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: {e}") from None
+
+            values.setdefault("subdir_name", values["project_name"])
+            values.setdefault("git_backend", git_backend)
+            values["project_dir"] = os.path.abspath(values.get("project_dir", "."))
+            projects.append(ProjectGenerator(**values))
+    return projects
+
+
+def init_worker(assets: Dict[str, bytes], store: ContentStore | None = None,
+                send_metrics: bool = False) -> None:
+    global _send_metrics
+    _assets.update(assets)
+    writer.store = store
+    _send_metrics = send_metrics
+    if send_metrics:
+        metrics.registry.enabled = True
+
+
+def run_project(item: Tuple[int, ProjectGenerator]) -> dict:
+    """Create one project, errors are returned in the result"""
+    index, proj = item
+    result = {"index": index, "name": proj.project_name, "ok": True, "error": "",
+              "seconds": 0.0, "timings": proj.timings}
+    start = time.perf_counter()
+    with sink.buffered():  # Messages are written by the parent, see report()
+        try:
+            os.makedirs(proj.project_dir, exist_ok=True)
+            proj.create(_assets)
+            proj.commit()
+        except (Exception, SystemExit) as e:
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["messages"] = sink.take()
+    result["dir"] = proj.project_dir
+    result["seconds"] = time.perf_counter() - start
+    if _send_metrics:
+        result["metrics"] = metrics.registry.drain()
+    return result
+
+
+def report(result: dict, done: int, progress: Progress) -> None:
+    """Messages and status of a finished project
+
+    On a terminal only failed projects are written, above a progress line.
+    """
+    status = "ok" if result["ok"] else f"FAILED {result['error']}"
+    lines = result.pop("messages", []) + [
+        f"[{done}/{progress.total}] {result['name']} {status} ({result['seconds']*1000:.1f} ms)"]
+    if not progress.enabled:
+        sink.write("\n".join(lines))
+        return
+    if not result["ok"]:
+        progress.line("\n".join(lines))
+    progress.update(done, result["name"])
+
+
+def run(projects: List[ProjectGenerator], jobs: int = 1,
+        assets: Dict[str, bytes] | None = None,
+        store: ContentStore | None = None) -> List[dict]:
+    """Create all projects, with jobs worker processes if jobs > 1
+
+    Assets are read once and handed to every worker.
+
+    Returns:
+        List[dict]: Result of each project, in project order
+    """
+    if assets is None:
+        assets = load_assets()
+    items = list(enumerate(projects))
+    results: List[dict] = []
+    progress = Progress(len(items))
+
+    with sink.buffered():
+        if jobs <= 1:
+            init_worker(assets, store)
+            for item in items:
+                results.append(run_project(item))
+                report(results[-1], len(results), progress)
+            progress.close()
+            return results
+
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(assets, store, metrics.registry.enabled)) as pool:
+            futures = [pool.submit(run_project, item) for item in items]
+            for future in as_completed(futures):
+                results.append(future.result())
+                metrics.registry.merge(results[-1].pop("metrics", {}))
+                report(results[-1], len(results), progress)
+        progress.close()
+    return sorted(results, key=lambda r: r["index"])
+
+
+def summary(results: List[dict], seconds: float, jobs: int) -> str:
+    failed = [r for r in results if not r["ok"]]
+    rate = len(results) / seconds if seconds > 0 else 0.0
+    lines = [f"{len(results)} projects, {len(results) - len(failed)} created, "
+             f"{len(failed)} failed in {seconds:.2f} s ({rate:.1f} projects/s, {jobs} jobs)."]
+
+    lines.append(f"  {'Phase':10} {'total ms':>10} {'mean ms':>10} {'max ms':>10}")
+    for phase in PHASES:
+        times = [r["timings"][phase] for r in results if phase in r["timings"]]
+        if len(times) > 0:
+            lines.append(f"  {phase:10} {sum(times)*1000:10.1f} "
+                         f"{sum(times)/len(times)*1000:10.1f} {max(times)*1000:10.1f}")
+
+    if len(failed) > 0:
+        lines.append("Failed projects:")
+        lines += [f"  {r['name']} ({r['dir']}): {r['error']}" for r in failed]
+
+    return "\n".join(lines)
+
+
+def main() -> None:
+    import sys
+
+    projects = load_csv(sys.argv[1])
+    start = time.perf_counter()
+    results = run(projects, os.cpu_count() or 1)
+    print(summary(results, time.perf_counter() - start, os.cpu_count() or 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,73 +15,190 @@
 
 from __future__ import annotations
 
+import copy
+import json
+import logging
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import List
-
-from sympy import N
+from enum import IntEnum
+from functools import lru_cache
+from typing import IO, Dict, Iterator, List, Sequence, Set, Tuple
+
+import metrics
+import questions
+from imports import Import, format_imports, split_imports
+from manifest import Manifest, digest, digest_chunks
+from placeholders import RenderPlan
+from profiler import profiler
+from query import Query, QuerySequence, QueryType, question_id
+from writer import writer
+
+
+class Section(IntEnum):
+    """Text sections of PyTemplate, index into PyTemplate.texts"""
+    PREAMBLE = 0
+    HEADER = 1
+    IMPORTS = 2
+    VARIABLES = 3
+    CODE = 4
+    MAIN_FUNC_DECLARATION = 5
+    MAIN_FUNC_INIT = 6
+    MAIN_FUNC = 7
+    MAIN_FUNC_END = 8
+    ARGPARSE_INIT = 9
+    ARGPARSE_ARGS = 10
+    ARGPARSE_SUBPARSER = 11
+    ARGPARSE_PARSE = 12
+    ARGPARSE_EXEC = 13
+    MAIN = 14
+    CLASS_DECORATORS = 15
+    CLASS_VARS = 16
+    CLASS_METHODS = 17
+
+
+# Keyword/attribute name of each section, in Section order
+SECTIONS = (
+    "preamble_text",
+    "header_text",
+    "imports_text",
+    "variables_text",
+    "code_text",
+    "main_func_declaration",
+    "main_func_init_text",
+    "main_func_text",
+    "main_func_end_text",
+    "argparse_init",
+    "argparse_args",
+    "argparse_subparser",
+    "argparse_parse",
+    "argparse_exec",
+    "main_text",
+    "class_decorators",
+    "class_vars",
+    "class_methods",
+)
 
-from query import Query
+SECTION_BY_NAME: Dict[str, Section] = {
+    name: Section(i) for i, name in enumerate(SECTIONS)
+}
 
 
-@dataclass
 class PyTemplate:
-    text: str = ""
-    preamble_text: str = ""
-    header_text: str = ""
-    imports_text: str = ""
-    variables_text: str = ""
-    code_text: str = ""
-    main_func_declaration: str = ""
-    main_func_init_text: str = ""
-    main_func_text: str = ""
-    main_func_end_text: str = ""
-    argparse_init: str = ""
-    argparse_args: str = ""
-    argparse_subparser: str = ""
-    argparse_parse: str = ""
-    argparse_exec: str = ""
-    main_text: str = ""
-    query_text: str = ""
-    class_decorators: str = ""
-    class_vars: str = ""
-    class_methods: str = ""
-    # class_text: str = ""
-    do_query: bool = False
-    include: bool = True
-    alt: List[PyTemplate] = field(default_factory=list)
+    """Code template, one text per Section
+
+    Sections are given as keyword arguments by their attribute name, like
+    code_text="...", and are kept in the fixed size list texts. Imports are
+    given as Import objects, so the generator can merge and sort them;
+    imports_text is for import code that must stay as written. Texts added
+    by add() are kept as fragments until the texts are read.
+    """
+
+    __slots__ = ("_texts", "_added", "imports", "text", "query_text",
+                 "do_query", "include", "alt", "key")
+
+    def __init__(self, text: str = "", query_text: str = "",
+                 do_query: bool = False, include: bool = True,
+                 alt: List[PyTemplate] | None = None,
+                 key: str = "", imports: Sequence[Import] = (),
+                 **sections: str) -> None:
+        self._texts: List[str] = [""] * len(Section)
+        self._added: List[List[str]] | None = None
+        for name, value in sections.items():
+            if name not in SECTION_BY_NAME:
+                raise TypeError(f"{type(self).__name__}() got an unexpected "
+                                f"keyword argument '{name}'")
+            self._texts[SECTION_BY_NAME[name]] = value
+        self.imports: Tuple[Import, ...] = tuple(imports)
+        self.text = text
+        self.query_text = query_text
+        self.do_query = do_query
+        self.include = include
+        self.alt: Sequence[PyTemplate] = () if alt is None else alt
+        self.key = key
+
+    @property
+    def texts(self) -> List[str]:
+        """Text of each Section"""
+        if self._added is not None:
+            self._texts = ["".join(added) for added in self._added]
+            self._added = None
+        return self._texts
+
+    @texts.setter
+    def texts(self, texts: List[str]) -> None:
+        self._texts = texts
+        self._added = None
+
+    def _slot_values(self) -> Iterator[Tuple[object, object]]:
+        """(slot descriptor, value) of all set slots"""
+        self.texts  # Join added fragments
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get("__slots__", ()):
+                slot = cls.__dict__[name]
+                try:
+                    yield slot, slot.__get__(self)
+                except AttributeError:  # Not set
+                    pass
+
+    def __copy__(self) -> PyTemplate:
+        template = type(self).__new__(type(self))
+        for slot, value in self._slot_values():
+            slot.__set__(template, value)
+        template.texts = list(self.texts)
+        return template
+
+    def __repr__(self) -> str:
+        texts = ", ".join(f"{SECTIONS[i]}={t!r}"
+                          for i, t in enumerate(self.texts) if t != "")
+        return (f"{type(self).__name__}(key={self.key!r}, "
+                f"imports={self.imports!r}, {texts})")
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return list(self._slot_values()) == list(other._slot_values())
+
+    __hash__ = None  # type: ignore
 
     def add(self, other: PyTemplate):
-        self.preamble_text += other.preamble_text
-        self.header_text += other.header_text
-        self.imports_text += other.imports_text
-        self.variables_text += other.variables_text
-        self.code_text += other.code_text
-        self.main_func_declaration += other.main_func_declaration
-
-        self.main_func_init_text += other.main_func_init_text
-        self.main_func_text += other.main_func_text
-        self.main_func_end_text += other.main_func_end_text
-
-        self.main_text += other.main_text
-
-        self.argparse_init += other.argparse_init
-        self.argparse_args += other.argparse_args
-        self.argparse_subparser += other.argparse_subparser
-        self.argparse_parse += other.argparse_parse
-        self.argparse_exec += other.argparse_exec
-
-        self.class_decorators += other.class_decorators
-        self.class_vars += other.class_vars
-        self.class_methods += other.class_methods
-
-    def query(self) -> None:
+        if self._added is None:
+            self._added = [[text] for text in self._texts]
+        for added, text in zip(self._added, other.texts):
+            if text != "":
+                added.append(text)
+        self.imports += other.imports
+
+    def qid(self) -> str:
+        if self.key != "":
+            return f"template.{self.key}"
+        return question_id(self.query_text)
+
+    def add_queries(self, sequence: QuerySequence,
+                    requires: Sequence[str] = ()) -> None:
+        """Add include question, the one of the alternative requires this
+        to be included"""
+        if self.do_query is False:
+            return
+        sequence.add_query(Query(QueryType.BOOL, self.query_text,
+                                 default=self.include, qid=self.qid(),
+                                 requires=requires))
+        for alt in self.alt[:1]:
+            alt.add_queries(sequence, (self.qid(),))
+
+    def answer(self, values: Dict[str, object]) -> None:
+        """Set include choices from the answers of a QuerySequence"""
         if self.do_query is False:
             return
-        self.include = Query.read_bool(self.query_text, self.include)
-        if self.include is True and len(self.alt) > 0:
-            self.alt[0].query()
+        if values.get(self.qid()) is not None:
+            self.include = values[self.qid()]
+        for alt in self.alt[:1]:
+            alt.answer(values)
+
+    def query(self) -> None:
+        sequence = QuerySequence()
+        self.add_queries(sequence)
+        self.answer(sequence.run())
 
     def get(self) -> PyTemplate:
         if len(self.alt) > 0:
@@ -90,17 +207,58 @@ class PyTemplate:
 
         return self
 
+    def toggles(self) -> List[dict]:
+        """Description of the include choices of this template,
+        alternatives nested"""
+        if self.do_query is False:
+            return []
+        return [{"key": self.key,
+                 "question": self.query_text,
+                 "default": self.include,
+                 "alt": [t for alt in self.alt[:1] for t in alt.toggles()]}]
+
+    def configure(self, toggles: Dict[str, bool]) -> PyTemplate:
+        """Copy of template with include choices from toggles, not queries
+
+        Templates missing in toggles keep their default choice.
+        """
+        template = copy.copy(self)
+        template.do_query = False
+        template.include = toggles.get(self.key, self.include)
+        template.alt = [alt.configure(toggles) for alt in self.alt]
+        return template
+
+
+def _section_property(section: Section) -> property:
+    def get(self: PyTemplate) -> str:
+        return self.texts[section]
+
+    def set(self: PyTemplate, text: str) -> None:
+        self.texts[section] = text
+
+    return property(get, set)
+
+
+for _section, _name in zip(Section, SECTIONS):
+    setattr(PyTemplate, _name, _section_property(_section))
+
 
-@dataclass
 class ClassTemplate(PyTemplate):
-    name: str = ""
-    parrent: str = ""
-    methods: str = ""
-    dataclass: bool = False
-    _init: str = ""
-    _str: str = ""
-    _eq: str = ""
-    vars = None
+    __slots__ = ("name", "parrent", "methods", "dataclass", "_init", "_str",
+                 "_eq", "vars")
+
+    def __init__(self, name: str = "", parrent: str = "", methods: str = "",
+                 dataclass: bool = False, _init: str = "", _str: str = "",
+                 _eq: str = "", **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.name = name
+        self.parrent = parrent
+        self.methods = methods
+        self.dataclass = dataclass
+        self._init = _init
+        self._str = _str
+        self._eq = _eq
+        self.vars = None
 
     def add_var(self, name, type="", default=""):
         if self.vars is None:
@@ -142,6 +300,10 @@ class PyConf:
 
     out_dir: str = ""
     has_separators: bool = False
+    defer_imports: bool = False  # Import main() only modules inside main()
+
+    # User defined placeholders, name without underscores
+    tokens: Dict[str, str] = field(default_factory=dict)
 
     query_name: bool = True
     query_file_name: bool = True
@@ -153,115 +315,299 @@ class PyConf:
         self.date = datetime.now().strftime("%Y-%m-%d")
         # self.out_dir = os.getcwd()
 
-    def query(self, args) -> None:
-        self.query_attr(args.name, "name", "Enter module name", "")
-        self.query_attr(None, "file_name", "Enter file name", self.name + ".py")
-        self.query_attr(args.description, "description", "Enter brief description", "")
-        self.query_attr(args.author, "author", "Enter name of author", os.getenv("BP_NAME"))
-        self.query_attr(args.email, "email", "Enter email of author", os.getenv("BP_EMAIL"))
-
-    def query_attr(self, cmd_arg: str | None, attribute: str, question: str, default: str) -> None:
+    @staticmethod
+    def from_dict(data: Dict[str, object], strict: bool = False) -> PyConf:
+        """Configuration from a dict of field values, like dataclasses.asdict()
+
+        Unknown fields are ignored, or raise ValueError if strict.
+        """
+        names = {f.name for f in fields(PyConf)}
+        unknown = data.keys() - names
+        if strict and len(unknown) > 0:
+            raise ValueError("Unknown configuration fields: "
+                             + ", ".join(sorted(unknown)))
+        return PyConf(**{k: v for k, v in data.items() if k in names})
 
-        if getattr(self, f"query_{attribute}") is not True:
-            return
+    def query(self, args) -> None:
+        questions.query_conf(self, args)
+
+    def mapping(self) -> Dict[str, str]:
+        """Placeholder values by token name"""
+        mapping = {
+            "NAME": self.name,
+            "DESCRIPTION": self.description,
+            "AUTHOR": self.author,
+            "EMAIL": "" if self.email == "" else f"<{self.email}>",
+            "DATE": self.date,
+            "LICENSE": self.license,
+            "ORG": self.org,
+            "ORGANISATION": self.org,
+            "ORGANISTATION": self.org,
+            "PROJECT": self.project,
+        }
+        mapping.update(self.tokens)
+        return mapping
+
+    def digest(self) -> str:
+        """Hash of everything in the configuration that affects the output
+
+        The date is left out, regenerating an unchanged file on another day
+        keeps the file as it is.
+        """
+        mapping = self.mapping()
+        del mapping["DATE"]
+        return digest(json.dumps([self.file_name, mapping], sort_keys=True))
+
+
+class Sections:
+    """Text fragments of merged templates, kept per section
+
+    Fragments are only joined when the text of a section is requested,
+    merging many templates never copies already collected text.
+    """
+
+    __slots__ = ("fragments", "imports")
+
+    def __init__(self) -> None:
+        self.fragments: List[List[str]] = [[] for _ in Section]
+        self.imports: List[Import] = []
+
+    def add(self, template: PyTemplate) -> None:
+        self.add_texts(template.texts)
+        self.imports.extend(template.imports)
+
+    def add_texts(self, texts: Sequence[str]) -> None:
+        """Add section texts of one template, in Section order"""
+        for fragments, text in zip(self.fragments, texts):
+            if text != "":
+                fragments.append(text)
+
+    def get(self, section: Section) -> str:
+        return "".join(self.fragments[section])
+
+    def has(self, section: Section) -> bool:
+        return len(self.fragments[section]) > 0
+
+
+def layout(sections: Sections, has_separators: bool,
+           defer_imports: bool = False) -> List[Tuple[str, str]]:
+    """Arrange merged sections into the named parts of a python file
+
+    With defer_imports, deferrable imports are placed at the start of main()
+    instead of at module level. Variables, code and main are each followed
+    by two blank lines, whatever blank lines their templates start or end
+    with.
+    """
+    fragments = sections.fragments
+    has = sections.has
+
+    def separator(header: str) -> List[str]:
+        if has_separators:
+            return [f"# {header} {'-'*(75-len(header))}\n\n"]
+        return []
+
+    def block(parts: List[str]) -> str:
+        text = "".join(parts).strip("\n")
+        return text + "\n\n\n" if text != "" else ""
+
+    module_imports, local_imports = split_imports(
+        sections.imports, defer_imports and has(Section.MAIN_FUNC_DECLARATION))
+
+    import_groups = ([format_imports(module_imports)]
+                     + fragments[Section.IMPORTS])
+    import_groups = [text for text in import_groups if text != ""]
+    imports = separator("Imports") + ["\n".join(import_groups)]
+    if len(import_groups) > 0:
+        imports.append("\n\n")
+
+    variables = separator("Variables") + [block(fragments[Section.VARIABLES])]
+    code = separator("Code") + [block(fragments[Section.CODE])]
+
+    # main function
+    body: List[str] = []
+    if len(local_imports) > 0:
+        body += [format_imports(local_imports, "    "), "\n"]
+    body += fragments[Section.MAIN_FUNC_INIT]
+    body += fragments[Section.MAIN_FUNC]
+
+    if has(Section.ARGPARSE_INIT):
+        body += fragments[Section.ARGPARSE_INIT]
+        body += fragments[Section.ARGPARSE_ARGS]
+        body += fragments[Section.ARGPARSE_SUBPARSER]
+        body += fragments[Section.ARGPARSE_PARSE]
+        body += fragments[Section.ARGPARSE_EXEC]
+
+    body += fragments[Section.MAIN_FUNC_END]
+
+    if has(Section.MAIN_FUNC_DECLARATION) and len(body) == 0:
+        body = ["    pass\n"]
+    main = fragments[Section.MAIN_FUNC_DECLARATION] + body
+
+    return [
+        ("preamble", sections.get(Section.PREAMBLE)),
+        ("header", sections.get(Section.HEADER)),
+        ("imports", "".join(imports)),
+        ("variables", "".join(variables)),
+        ("code", "".join(code)),
+        ("main", block(main)),
+        ("__main__", sections.get(Section.MAIN)),  # __name__ == "__main__"
+    ]
+
+
+@lru_cache(maxsize=256)
+def _compile(texts: Tuple[Tuple[str, ...], ...], imports: Tuple[Import, ...],
+             has_separators: bool, defer_imports: bool) -> RenderPlan:
+    sections = Sections()
+    for template_texts in texts:
+        sections.add_texts(template_texts)
+    sections.imports.extend(imports)
+    return RenderPlan(layout(sections, has_separators, defer_imports))
+
+
+def compile_plan(templates: List[PyTemplate], has_separators: bool = False,
+                 defer_imports: bool = False) -> RenderPlan:
+    """Render plan of already resolved templates
+
+    Plans are cached on the section texts, so the same combination of
+    templates is only compiled once per process, whatever configuration
+    it is rendered with.
+    """
+    texts = tuple(tuple(t.texts) for t in templates)
+    imports = tuple(imp for t in templates for imp in t.imports)
+    return _compile(texts, imports, has_separators, defer_imports)
 
-        if cmd_arg is None:  # If command line arguments are present use them
-            setattr(self, attribute,
-                    Query.read_string(question, default))
-            return
 
-        setattr(self, attribute, cmd_arg)
+class PyGenerator(PyTemplate):
+    """docstring for generator.
 
+    Section attributes, like imports_text, are the merged texts of the
+    added templates. generate() only resolves and compiles the templates.
+    The output is rendered part by part by stream(), write() and dump()
+    consume it without building the complete text. Accessing text renders
+    it in full.
+    """
 
-class PyGenerator(PyTemplate):
-    """docstring for generator."""
+    __slots__ = ("conf", "templates", "sections", "resolved", "plan",
+                 "mapping", "unresolved", "_text")
 
     def __init__(self, conf: PyConf,  templates: List[PyTemplate]):
         super().__init__()
         self.conf = conf
         self.templates = templates
+        self.sections = Sections()
+        self.resolved: List[PyTemplate] = []
+        self.plan: RenderPlan | None = None
+        self.mapping: Dict[str, str] = {}
+        self.unresolved: Set[str] = set()
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(text for _, text in self.stream())
+        return self._text
+
+    @text.setter
+    def text(self, text: str) -> None:
+        self._text = text
 
     def clear(self):
         self.text = ""
+        self.sections = Sections()
 
-    def replace(self, old: str, new: str):
-        self.text = self.text.replace(old, new)
+    def add(self, other: PyTemplate):
+        self.sections.add(other)
 
-    def add_separator(self, header):
-        if self.conf.has_separators:
-            self.text += f"# {header} {'-'*(75-len(header))}\n\n"
+    def section(self, section: Section) -> str:
+        """Merged text of one section"""
+        return self.sections.get(section)
 
     def generate(self):
+        with profiler.phase("generate"), metrics.timed(metrics.render_seconds):
+            self._generate()
+        if metrics.registry.enabled:
+            metrics.templates_merged.inc(len(self.resolved))
+
+    def _generate(self):
         self.clear()
 
-        for template in self.templates:
-            template.query()
-
-        for template in self.templates:
-            if template.include is True:
-                ta = template.get()
-                self.add(ta)
-
-        self.text += self.preamble_text
-        self.text += self.header_text
-        self.add_separator("Imports")
-        self.text += self.imports_text
-        if len(self.imports_text) > 0:
-            self.text += "\n\n"
-        self.add_separator("Variables")
-        self.text += self.variables_text
-        self.add_separator("Code")
-        self.text += self.code_text
-
-        self.text += self.main_func_declaration
-
-        text = ""
-        # main function
-        text += self.main_func_init_text
-        text += self.main_func_text
-
-        if self.argparse_init != "":
-            text += self.argparse_init
-            text += self.argparse_args
-            text += self.argparse_subparser
-            text += self.argparse_parse
-            text += self.argparse_exec
-
-        text += self.main_func_end_text
-
-        # if len(self.main_func_declaration) > 0 and len(self.main_func_text) == 0:
-        if len(self.main_func_declaration) > 0 and len(text) == 0:
-            self.text += "    pass\n"
-        else:
-            self.text += text
+        with profiler.phase("template_query"):
+            sequence = QuerySequence()
+            for template in self.templates:
+                template.add_queries(sequence)
+            values = sequence.run()
+            for template in self.templates:
+                template.answer(values)
+
+        self.resolved = [t.get() for t in self.templates if t.include is True]
+        for template in self.resolved:
+            self.add(template)
+
+        self.plan = compile_plan(self.resolved, self.conf.has_separators,
+                                 self.conf.defer_imports)
+        self.mapping = self.conf.mapping()
+        self.unresolved = self.plan.tokens() - self.mapping.keys()
+        self._text = None  # Rendered on demand
+        if len(self.unresolved) > 0:
+            logging.warning("Unresolved placeholders: " + ", ".join(
+                f"__{t}__" for t in sorted(self.unresolved)))
+
+    def stream(self) -> Iterator[Tuple[str, str]]:
+        """Rendered output as (part name, text), in file order
+
+        Parts are preamble, header, imports, variables, code, main and
+        __main__.
+        """
+        if self._text is not None:  # Already rendered, or set by hand
+            yield "text", self._text
+            return
 
-        self.text += "\n\n"
+        # Unresolved placeholders were reported by generate()
+        for i, name in enumerate(self.plan.names()):
+            yield name, self.plan.render_part(i, self.mapping)
 
-        # __name__ == "__main__"
-        self.text += self.main_text
+    def count_rendered(self) -> None:
+        """Count one rendered file, once it has been output"""
+        if metrics.registry.enabled:
+            metrics.files_rendered.inc()
+            metrics.placeholders.inc(self.plan.substituted(self.mapping))
 
-        self.replace("__NAME__", self.conf.name)
-        self.replace("__DESCRIPTION__", self.conf.description)
-        self.replace("__AUTHOR__", self.conf.author)
+    def chunks(self) -> Iterator[str]:
+        return (text for _, text in self.stream())
 
-        if self.conf.email == "":
-            self.replace("__EMAIL__", "")
-        else:
-            self.replace("__EMAIL__", f"<{self.conf.email}>")
+    def dump(self, file: IO[str]) -> None:
+        """Write output to an open text file, like a pipe or stdout"""
+        for text in self.chunks():
+            file.write(text)
+        self.count_rendered()
 
-        self.replace("__DATE__", self.conf.date)
-        self.replace("__LICENSE__", self.conf.license)
+    def write(self, dir=None, incremental: bool = False) -> str:
+        with profiler.phase("write"), metrics.timed(metrics.write_seconds):
+            return self._write(dir, incremental)
 
-    def write(self, dir=None) -> str:
+    def _write(self, dir=None, incremental: bool = False) -> str:
         if dir is None:
             file_name = f"{self.conf.out_dir}/{self.conf.file_name}"
         else:
             file_name = f"{dir}/{self.conf.file_name}"
 
-        with open(file_name, "w") as file:
-            file.write(self.text)
-
-        os.chmod(file_name, 0o770)
+        chunks = self.chunks()
+        if incremental:
+            manifest = Manifest.for_dir(os.path.dirname(file_name))
+            chunks = [self.text]  # Rendered once, for the digest and the write
+            hashes = (self.plan.digest(), self.conf.digest(),
+                      digest_chunks(chunks))
+            if manifest.is_current(file_name, *hashes):
+                Manifest.skipped += 1
+                print(f"\nSkipped unchanged {file_name}.")
+                return file_name
+
+        st = writer.write(file_name, chunks, 0o770)
+        self.count_rendered()
+        if metrics.registry.enabled:
+            metrics.bytes_written.inc(st.st_size)
+        if incremental:
+            manifest.record(file_name, *hashes, st=st)
+            Manifest.written += 1
         print(f"\nWrote {file_name} to disk.")
         # logging.info(f"Wrote {file_name} to disk.")
         return file_name
@@ -270,10 +616,21 @@ class PyGenerator(PyTemplate):
         return self.text
 
 
-t_init = PyTemplate(
-    imports_text="""\
-"""
-)
+def _merged_property(section: Section) -> property:
+    def get(self: PyGenerator) -> str:
+        return self.sections.get(section)
+
+    def set(self: PyGenerator, text: str) -> None:
+        self.sections.fragments[section] = [text] if text != "" else []
+
+    return property(get, set)
+
+
+for _section, _name in zip(Section, SECTIONS):
+    setattr(PyGenerator, _name, _merged_property(_section))
+
+
+t_init = PyTemplate()
 
 t_preamble = PyTemplate(
     preamble_text="""\
@@ -312,11 +669,7 @@ if __name__ == "__main__":
 )
 
 t_main_application = PyTemplate(
-    imports_text="""\
-import traceback
-import os
-import sys
-""",
+    imports=[Import("traceback"), Import("os"), Import("sys")],
     main_func_declaration="""\
 def main() -> None:
 """,
@@ -358,9 +711,7 @@ class App:
 t_argtable_cmd = PyTemplate(
     query_text="Include subcommand argument parser?",
     do_query=True,
-    imports_text="""\
-import argparse
-""",
+    imports=[Import("argparse", deferrable=True)],
     code_text="""
 def cmd_cmd1():
     pass
@@ -405,9 +756,7 @@ t_argtable = PyTemplate(
     query_text="Include argument parser?",
     do_query=True,
     alt=[t_argtable_cmd],
-    imports_text="""\
-import argparse
-""",
+    imports=[Import("argparse", deferrable=True)],
     argparse_init="""\
     parser = argparse.ArgumentParser(
         prog=App.NAME,
@@ -422,15 +771,91 @@ import argparse
     args = parser.parse_args()
 """,
 
-    #parser.print_help()
+    # parser.print_help()
+)
+
+t_logging_queue = PyTemplate(
+    query_text="Use non-blocking queue logging?",
+    do_query=True,
+    include=False,
+    # Used by module level functions, never deferred
+    imports=[Import("atexit"), Import("logging"), Import("logging.handlers"),
+             Import("queue")],
+    code_text="""\
+log_listener = None
+
+
+def start_logging(format: str, level: int = logging.WARNING,
+                  file_name: str = "", max_bytes: int = 0,
+                  backups: int = 3) -> None:
+    \"\"\"Log through a queue, a listener thread formats and writes records
+
+    With file_name records are also written to file_name, rotated at
+    max_bytes if max_bytes > 0. Calling again replaces the earlier setup.
+    \"\"\"
+    global log_listener
+    stop_logging()
+
+    handlers = [logging.StreamHandler()]
+    if file_name != "":
+        handlers.append(logging.handlers.RotatingFileHandler(
+            file_name, maxBytes=max_bytes, backupCount=backups))
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(format))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    log_listener.start()
+
+
+def stop_logging() -> None:
+    \"\"\"Write queued records and stop the listener thread\"\"\"
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        for handler in log_listener.handlers:
+            handler.close()
+        log_listener = None
+
+
+atexit.register(stop_logging)
+
+""",
+    main_func_init_text="""\
+    logging_format = ("[%(levelname)s] %(lineno)-4d %(funcName)-14s : "
+                      "%(message)s")
+    start_logging(logging_format)
+
+""",
+    argparse_args="""
+    parser.add_argument("--debug", action="store_true", default=False,
+                        help="Print debug messages, same as --log-level DEBUG")
+    parser.add_argument("--log-level", type=str, default="WARNING",
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR",
+                                 "CRITICAL"],
+                        help="Lowest level of logged messages")
+    parser.add_argument("--log-file", type=str, default="", metavar="FILE",
+                        help="Also log to FILE")
+    parser.add_argument("--log-max-bytes", type=int, default=0, metavar="N",
+                        help="Rotate the log file at N bytes, 0 never rotates")
+""",
+    argparse_exec="""
+    level = logging.DEBUG if args.debug else getattr(logging, args.log_level)
+    start_logging(logging_format, level, args.log_file, args.log_max_bytes)
+"""
 )
 
 t_logging = PyTemplate(
     query_text="Include logging?",
     do_query=True,
-    imports_text="""\
-import logging
-""",
+    alt=[t_logging_queue],
+    imports=[Import("logging", deferrable=True)],
     main_func_init_text="""\
     logging_format = "[%(levelname)s] %(lineno)-4d %(funcName)-14s : %(message)s"
     logging.basicConfig(format=logging_format)
@@ -449,16 +874,22 @@ import logging
 
 
 t_qt5 = PyTemplate(
-    imports_text="""\
-from PyQt5.QtCore import Qt, QTimer, QSettings, QIODevice
-from PyQt5.QtGui import QIcon, QCloseEvent
-from PyQt5.QtWidgets import QApplication, QMainWindow, QMenu, QMenuBar,\\
-                            QAction, QStatusBar, QDialog, QVBoxLayout,\\
-                            QHBoxLayout, QTextEdit, QDialogButtonBox,\\
-                            QPushButton, QMessageBox, QWidget, QLabel,\\
-                            QFileDialog, QSpacerItem, QSizePolicy
-""",
-    variables_text="""
+    # The window classes subclass Qt classes at module level, only the
+    # QApplication of main() can be deferred
+    imports=[Import("sys"),
+             Import("PyQt5.QtCore", ("Qt", "QTimer", "QSettings",
+                                     "QIODevice")),
+             Import("PyQt5.QtGui", ("QIcon", "QCloseEvent")),
+             Import("PyQt5.QtWidgets", ("QApplication",), deferrable=True),
+             Import("PyQt5.QtWidgets", ("QMainWindow", "QMenu", "QMenuBar",
+                                        "QAction", "QStatusBar", "QDialog",
+                                        "QVBoxLayout", "QHBoxLayout",
+                                        "QTextEdit",
+                                        "QDialogButtonBox", "QPushButton",
+                                        "QMessageBox", "QWidget", "QLabel",
+                                        "QFileDialog", "QSpacerItem",
+                                        "QSizePolicy"))],
+    variables_text="""\
 # Qt main window settings
 win_title = App.NAME
 win_x_size = 320
@@ -592,6 +1023,8 @@ class MainWindow(QMainWindow):
 )
 
 t_gtk = PyTemplate(
+    # require_version() must run between the imports, kept as written. Never
+    # deferred, MainWindow subclasses Gtk.Window at module level
     imports_text="""\
 import gi
 gi.require_version("Gtk", "3.0")
@@ -612,9 +1045,7 @@ class MainWindow(Gtk.Window):
 """
 )
 t_micro_python = PyTemplate(
-    imports_text="""\
-import pin
-""",
+    imports=[Import("pin")],
     code_text="""\
 """,
     main_func_text="""\
@@ -622,6 +1053,44 @@ import pin
 )
 
 
+# Templates used by each generator command
+template_sets: Dict[str, List[str]] = {
+    "new": ["t_preamble", "t_header", "t_main"],
+    "newa": ["t_preamble", "t_header", "t_main_application", "t_application",
+             "t_logging", "t_argtable"],
+    "newqt": ["t_preamble", "t_header", "t_main_application", "t_application",
+              "t_logging", "t_argtable", "t_qt5"],
+    "newgtk": ["t_preamble", "t_header", "t_application", "t_gtk"],
+    "newmp": ["t_header", "t_micro_python"],
+    "newpkg": ["t_init"],
+}
+
+
+def select(library: Dict[str, PyTemplate], command: str,
+           toggles: Dict[str, bool],
+           header_text: str | None = None) -> List[PyTemplate]:
+    """Templates of a generator command, include choices taken from toggles
+
+    Returns copies, the library templates are left as they are.
+    """
+    templates = [library[name].configure(toggles)
+                 for name in template_sets[command]]
+    if header_text is not None:
+        for template in templates:
+            if template.key == "t_header":
+                template.header_text = header_text
+    return templates
+
+
+def library() -> Dict[str, PyTemplate]:
+    """All module level templates by name"""
+    templates = {name: obj for name, obj in globals().items()
+                 if isinstance(obj, PyTemplate)}
+    for name, template in templates.items():
+        template.key = name
+    return templates
+
+
 def main() -> None:
     pass
 
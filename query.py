@@ -15,8 +15,17 @@
 
 from __future__ import annotations
 
+import json
+import os
+import re
 import sys
 from enum import Enum
+from typing import Callable, Dict, Sequence, Tuple
+
+from profiler import profiler
+
+VALID_TRUE = ["yes", "y", "ye", "true"]
+VALID_FALSE = ["no", "n", "false"]
 
 
 class QueryType(Enum):
@@ -27,14 +36,136 @@ class QueryType(Enum):
     BOOL = 5
 
 
+class MissingAnswer(ValueError):
+    pass
+
+
+def question_id(question: str) -> str:
+    """Id of a question without an explicit one, Save to file -> save_to_file"""
+    return re.sub(r"[^a-z0-9]+", "_", question.lower()).strip("_")
+
+
+def convert(type: QueryType, value: object) -> object:
+    """Answer from a file or the environment as a value of the query type"""
+    if type == QueryType.BOOL:
+        if isinstance(value, bool):
+            return value
+        if str(value).lower() in VALID_TRUE:
+            return True
+        if str(value).lower() in VALID_FALSE:
+            return False
+        raise ValueError(f"invalid boolean answer: '{value}'")
+    if type == QueryType.INTEGER:
+        return int(value)
+    if type == QueryType.FLOAT:
+        return float(value)
+    return str(value)
+
+
+class AnswerProvider:
+    """Source of answers, consulted before a question is asked
+
+    lookup() returns (True, answer) if the provider has an answer for the
+    question id, (False, None) if the question should be asked.
+    """
+
+    def lookup(self, qid: str, question: str, type: QueryType,
+               default) -> Tuple[bool, object]:
+        return False, None
+
+
+class InteractiveAnswers(AnswerProvider):
+    """Asks every question on the terminal"""
+
+
+class DefaultAnswers(AnswerProvider):
+    """Answers every question with its default"""
+
+    def lookup(self, qid: str, question: str, type: QueryType,
+               default) -> Tuple[bool, object]:
+        if default is not None:
+            return True, default
+        raise MissingAnswer(f"No answer for '{qid}' ({question}) and no default")
+
+
+class MappingAnswers(AnswerProvider):
+    """Answers by question id, other questions go to fallback"""
+
+    def __init__(self, answers: Dict[str, object],
+                 fallback: AnswerProvider | None = None) -> None:
+        self.answers = answers
+        self.fallback = InteractiveAnswers() if fallback is None else fallback
+
+    def lookup(self, qid: str, question: str, type: QueryType,
+               default) -> Tuple[bool, object]:
+        if qid in self.answers:
+            return True, convert(type, self.answers[qid])
+        return self.fallback.lookup(qid, question, type, default)
+
+
+class FileAnswers(MappingAnswers):
+    """Answers from a JSON object of question ids and answers"""
+
+    def __init__(self, file_name: str, fallback: AnswerProvider | None = None) -> None:
+        with open(file_name) as file:
+            answers = json.load(file)
+        if not isinstance(answers, dict):
+            raise ValueError(f"{file_name}: expected an object of answers")
+        super().__init__(answers, fallback)
+
+
+class EnvAnswers(AnswerProvider):
+    """Answers from environment variables, PPL_ANSWER_CONF_NAME for conf.name"""
+
+    def __init__(self, fallback: AnswerProvider | None = None,
+                 prefix: str = "PPL_ANSWER_") -> None:
+        self.fallback = InteractiveAnswers() if fallback is None else fallback
+        self.prefix = prefix
+
+    def variable(self, qid: str) -> str:
+        return self.prefix + re.sub(r"[^A-Z0-9]", "_", qid.upper())
+
+    def lookup(self, qid: str, question: str, type: QueryType,
+               default) -> Tuple[bool, object]:
+        value = os.getenv(self.variable(qid))
+        if value is not None:
+            return True, convert(type, value)
+        return self.fallback.lookup(qid, question, type, default)
+
+
+def make_answers(file_name: str | None = None, defaults: bool = False) -> AnswerProvider:
+    """Answers from file_name, then environment, then defaults or terminal"""
+    provider: AnswerProvider = DefaultAnswers() if defaults else InteractiveAnswers()
+    provider = EnvAnswers(provider)
+    if file_name is not None:
+        provider = FileAnswers(file_name, provider)
+    return provider
+
+
 class Query:
-    """A simple query class """
+    """A simple query class
+
+    All read functions first ask the answer provider in Query.answers,
+    the question is only asked on the terminal if it has no answer. Each
+    question has a stable id, given or derived from the question text.
+    Answers are kept by id in Query.given, so they can be saved and
+    replayed.
+    """
+
+    answers: AnswerProvider = InteractiveAnswers()
+    given: Dict[str, object] = {}
+
     def __init__(self, type: QueryType, query_string: str,
-                 min=None, Max=None, default=None) -> None:
+                 min=None, Max=None, default=None, qid: str | None = None,
+                 requires: Sequence[str] = ()) -> None:
         self.value = None
         self.type = type
         self.query_string = query_string
-        self.default = default
+        self.min = min
+        self.max = Max
+        self.default = default  # Value, or function of the answers so far
+        self.qid = question_id(query_string) if qid is None else qid
+        self.requires = tuple(requires)
 
     def is_true(self):
         if self.type == QueryType.BOOL and self.value is True:
@@ -42,16 +173,56 @@ class Query:
         else:
             return False
 
-    def query(self):
+    def query(self, values: Dict[str, object] | None = None):
+        default = self.default
+        if callable(default):
+            default = default({} if values is None else values)
         if self.type == QueryType.BOOL:
-            self.value = self.read_bool(self.query_string, self.default)
+            self.value = self.read_bool(self.query_string, default, self.qid)
         if self.type == QueryType.STRING:
-            self.value = self.read_string(self.query_string, self.default)
+            self.value = self.read_string(self.query_string, default, self.qid)
         if self.type == QueryType.INTEGER:
-            pass
+            self.value = self.read_integer(self.query_string, default, self.min,
+                                           self.max, self.qid)
+
+    @staticmethod
+    def answer(type: QueryType, question: str, default, qid: str | None,
+               ask: Callable[[], object]):
+        """Answer from the provider, or from ask() if it has none"""
+        if qid is None:
+            qid = question_id(question)
+        with profiler.phase("query_wait"):
+            found, value = Query.answers.lookup(qid, question, type, default)
+            if not found:
+                value = ask()
+        Query.given[qid] = value
+        return value
+
+    @staticmethod
+    def save_given(file_name: str) -> None:
+        """Save answers given so far, for FileAnswers"""
+        with open(file_name, "w") as file:
+            json.dump(Query.given, file, indent=2, sort_keys=True)
+            file.write("\n")
 
     @staticmethod
-    def read_string(question: str, default=None) -> str:
+    def read_string(question: str, default=None, qid: str | None = None) -> str:
+        return Query.answer(QueryType.STRING, question, default, qid,
+                            lambda: Query.ask_string(question, default))
+
+    @staticmethod
+    def read_integer(question: str, default=None, min=None, max=None,
+                     qid: str | None = None) -> int:
+        return Query.answer(QueryType.INTEGER, question, default, qid,
+                            lambda: Query.ask_integer(question, default, min, max))
+
+    @staticmethod
+    def read_bool(question: str, default=None, qid: str | None = None) -> bool:
+        return Query.answer(QueryType.BOOL, question, default, qid,
+                            lambda: Query.ask_bool(question, default))
+
+    @staticmethod
+    def ask_string(question: str, default=None) -> str:
         """Retrieve string input from user
 
         Args:
@@ -79,7 +250,7 @@ class Query:
                 return choice
 
     @staticmethod
-    def read_integer(question: str, default=None, min=None, max=None) -> int:
+    def ask_integer(question: str, default=None, min=None, max=None) -> int:
         if default is not None:
             prompt = f"[{default}] > "
         elif min is None and max is None:
@@ -117,7 +288,7 @@ class Query:
                 return default
 
     @staticmethod
-    def read_bool(question: str, default=None) -> bool:
+    def ask_bool(question: str, default=None) -> bool:
         valid_true = ["yes", "y", "ye"]
         valid_false = ["no", "n"]
 
@@ -159,16 +330,53 @@ class Query:
 
 
 class QuerySequence:
+    """Questions as a graph, each enabled by the answers of earlier ones
+
+    A query lists the ids of the queries it requires, it is only asked, or
+    answered by the provider, when all of them were answered with a true
+    value. Questions of disabled branches are never evaluated. Answers are
+    memoized by id, a query added twice, like by two templates, is asked
+    once.
+    """
+
     def __init__(self) -> None:
-        self.querys = []
+        self.querys: Dict[str, Query] = {}
+        self.values: Dict[str, object] = {}
 
     def add_query(self, query: Query) -> Query:
-        self.querys.append(query)
+        """Add query, or return the one already added with the same id"""
+        if query.qid in self.querys:
+            return self.querys[query.qid]
+        for qid in query.requires:
+            if qid not in self.querys:
+                raise ValueError(f"Query '{query.qid}' requires unknown query '{qid}'")
+        self.querys[query.qid] = query
         return query
 
-    def run(self):
-        for q in self.querys:
-            q.query()
+    def is_enabled(self, query: Query) -> bool:
+        return all(self.resolve(qid) for qid in query.requires)
+
+    def resolve(self, qid: str):
+        """Answer of query qid, None if it is disabled"""
+        if qid in self.values:
+            return self.values[qid]
+        query = self.querys[qid]
+        if self.is_enabled(query):
+            query.query(self.values)
+            self.values[qid] = query.value
+        else:
+            self.values[qid] = None
+        return self.values[qid]
+
+    def run(self, targets: Sequence[str] | None = None) -> Dict[str, object]:
+        """Resolve targets, all queries if None, in the order they were added
+
+        Returns:
+            Dict[str, object]: Answers by query id, None for disabled queries
+        """
+        for qid in self.querys if targets is None else targets:
+            self.resolve(qid)
+        return self.values
 
 
 def query_string(question: str, default=None) -> str:
@@ -302,10 +510,10 @@ def main():
 
     qs = QuerySequence()
     qs.add_query(
-        Query(QueryType.BOOL, "Do you want to answer more questions?"))
+        Query(QueryType.BOOL, "Do you want to answer more questions?", qid="more"))
     qs.add_query(
-        Query(QueryType.STRING, "Please enter string?"))
-    qs.run()
+        Query(QueryType.STRING, "Please enter string?", requires=["more"]))
+    print(qs.run())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Questions of generated files and projects, shared by ppl and pplc
+#
+# File:     questions.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+from typing import Dict
+
+import settings
+from query import Query, QuerySequence, QueryType
+
+# Variables ------------------------------------------------------------------
+
+# Include choices of a new project, by ProjectGenerator field
+PROJECT_DEFAULTS: Dict[str, bool] = {
+    "create_subdir": True,
+    "create_git": True,
+    "create_gitignore": True,
+    "create_readme": True,
+    "create_history": True,
+}
+
+
+# Code -----------------------------------------------------------------------
+def query_attr(conf, cmd_arg: str | None, attribute: str, question: str,
+               default: str | None) -> None:
+    """Set attribute from cmd_arg or by asking, a None default makes the answer required"""
+
+    if getattr(conf, f"query_{attribute}") is not True:
+        return
+
+    if cmd_arg is None:  # If command line arguments are present use them
+        setattr(conf, attribute,
+                Query.read_string(question, default, qid=f"conf.{attribute}"))
+        return
+
+    setattr(conf, attribute, cmd_arg)
+
+
+def query_conf(conf, args) -> None:
+    """Set the fields of a PyConf, or of an object with the same fields, from
+    args, settings or by asking"""
+    query_attr(conf, args.name, "name", "Enter module name", None)
+    query_attr(conf, None, "file_name", "Enter file name", conf.name + ".py")
+    query_attr(conf, args.description, "description", "Enter brief description", "")
+    defaults = settings.current()
+    query_attr(conf, args.author, "author", "Enter name of author", defaults.get("author"))
+    query_attr(conf, args.email, "email", "Enter email of author", defaults.get("email"))
+
+    org = getattr(args, "org", None)
+    conf.org = org if org is not None else defaults.get("org", conf.org)
+    project = getattr(args, "project", None)
+    conf.project = project if project is not None else defaults.get("project", conf.project)
+    conf.license = defaults.get("license", conf.license)
+    conf.tokens.update(getattr(args, "token", None) or [])
+    if getattr(args, "lazy_imports", False):
+        conf.defer_imports = True
+
+
+def project_queries(project_name: str = "",
+                    defaults: Dict[str, bool] = PROJECT_DEFAULTS) -> QuerySequence:
+    """Project questions, subdirectory and file questions depend on earlier answers"""
+    sequence = QuerySequence()
+    sequence.add_query(Query(QueryType.STRING, "Project name?",
+                             default=project_name or None, qid="project.name"))
+    sequence.add_query(Query(QueryType.BOOL, "Create subdirectory?",
+                             default=defaults["create_subdir"], qid="project.create_subdir"))
+    sequence.add_query(Query(QueryType.STRING, "Name of subdirectory?",
+                             default=lambda values: values["project.name"],
+                             qid="project.subdir_name", requires=["project.create_subdir"]))
+    sequence.add_query(Query(QueryType.BOOL, "Initiate git repository?",
+                             default=defaults["create_git"], qid="project.create_git"))
+    for attr, question in [("create_gitignore", "Create .gitignore?"),
+                           ("create_readme", "Create README.md?"),
+                           ("create_history", "Create HISTORY.md?")]:
+        sequence.add_query(Query(QueryType.BOOL, question, default=defaults[attr],
+                                 qid=f"project.{attr}", requires=["project.create_git"]))
+    return sequence
+
+
+def project_fields(values: Dict[str, object]) -> Dict[str, object]:
+    """ProjectGenerator fields of the answers of project_queries()"""
+    fields = {}
+    for qid, value in values.items():
+        attr = qid.partition(".")[2]
+        if value is not None:
+            fields["project_name" if attr == "name" else attr] = value
+    return fields
+
+
+def main() -> None:
+    print(project_fields(project_queries("demo").run()))
+
+
+if __name__ == "__main__":
+    main()
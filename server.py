@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Pyplate generator daemon serving requests over a Unix socket
+#
+# File:     server.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+from typing import TYPE_CHECKING, Dict
+
+from lazy import LazyModule
+
+if TYPE_CHECKING:
+    from pytemplates import PyGenerator, PyTemplate
+
+# Variables ------------------------------------------------------------------
+
+# Only the daemon loads the generator, request() is all pplc needs
+manifest = LazyModule("manifest")
+project = LazyModule("project")
+pytemplates = LazyModule("pytemplates")
+writer = LazyModule("writer")
+
+DEFAULT_SOCKET = os.getenv(
+    "PPL_SOCKET",
+    os.path.join(os.getenv("XDG_RUNTIME_DIR", "/tmp"), f"pyplate-{os.getuid()}.sock"))
+
+# Max size of one request
+MAX_REQUEST = 16 * 1024 * 1024
+
+
+# Code -----------------------------------------------------------------------
+def send_message(sock: socket.socket, message: dict) -> None:
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def recv_message(sock: socket.socket) -> dict:
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = sock.recv(65536)
+        if chunk == b"":
+            break
+        data += chunk
+        if len(data) > MAX_REQUEST:
+            raise ValueError("Message too large")
+    return json.loads(data)
+
+
+def request(message: dict, socket_path: str = DEFAULT_SOCKET) -> dict:
+    """Send one request to a running daemon and return its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        send_message(sock, message)
+        return recv_message(sock)
+
+
+class Server:
+    """Generator daemon keeping the template library loaded
+
+    Each connection carries one JSON request and gets one JSON response.
+    Requests are handled by a bounded pool of worker threads, connections
+    beyond workers + backlog wait in the listen queue. Rendering runs in
+    parallel; writes take write_lock, since the writer, its pending files
+    and the manifests are shared by all workers.
+    """
+
+    def __init__(self, library: Dict[str, PyTemplate],
+                 socket_path: str = DEFAULT_SOCKET, workers: int = 4,
+                 backlog: int = 16) -> None:
+        self.library = library
+        self.socket_path = socket_path
+        self.workers = workers
+        self.pending = threading.BoundedSemaphore(workers + backlog)
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.requests = 0
+
+    def describe(self, req: dict) -> dict:
+        toggles = [t for name in pytemplates.template_sets[req["command"]]
+                   for t in self.library[name].toggles()]
+        return {"ok": True, "toggles": toggles}
+
+    def generate(self, req: dict) -> dict:
+        conf = pytemplates.PyConf.from_dict(req.get("conf", {}))
+        generator = pytemplates.PyGenerator(conf, pytemplates.select(
+            self.library, req["command"], req.get("toggles", {}), req.get("header_text")))
+        generator.generate()
+        response = {"ok": True, "text": str(generator)}
+
+        if req.get("project") is not None or req.get("write", False):
+            with self.write_lock:
+                try:
+                    response["file_name"] = self.write(req, generator)
+                    writer.writer.commit()
+                except BaseException:
+                    writer.writer.abort()  # Pending files of this request only
+                    raise
+        else:
+            generator.count_rendered()  # Only rendered for the response
+        return response
+
+    def write(self, req: dict, generator: PyGenerator) -> str:
+        """Write the generated file, in a new project if the request has one"""
+        if req.get("project") is not None:
+            proj = project.ProjectGenerator(**req["project"])
+            proj.create()
+            file_name = generator.write(proj.project_dir)
+            writer.writer.commit()
+            proj.git_add(file_name)
+            proj.commit()
+            return file_name
+
+        if req.get("incremental", False):
+            file_name = generator.write(incremental=True)
+            manifest.Manifest.save_all()
+            return file_name
+        return generator.write()
+
+    def dispatch(self, req: dict) -> dict:
+        op = req.get("op")
+        if op == "describe":
+            return self.describe(req)
+        if op == "generate":
+            return self.generate(req)
+        if op == "ping":
+            return {"ok": True, "requests": self.requests}
+        if op == "shutdown":
+            self.stopping.set()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown operation '{op}'"}
+
+    def handle(self, conn: socket.socket) -> None:
+        try:
+            with conn:
+                try:
+                    response = self.dispatch(recv_message(conn))
+                except (Exception, SystemExit) as e:
+                    logging.error(f"Request failed: {e}")
+                    response = {"ok": False, "error": str(e)}
+                send_message(conn, response)
+        except OSError as e:
+            logging.error(f"Connection error: {e}")
+        finally:
+            with self.lock:
+                self.requests += 1
+            self.pending.release()
+
+    def stop(self, signum=None, frame=None) -> None:
+        self.stopping.set()
+
+    def serve(self) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        if os.path.exists(self.socket_path):
+            try:
+                request({"op": "ping"}, self.socket_path)
+                raise RuntimeError(f"Daemon already running on {self.socket_path}")
+            except OSError:
+                os.remove(self.socket_path)  # Stale socket
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        sock.listen()
+        sock.settimeout(0.2)
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        print(f"Serving on {self.socket_path} with {self.workers} workers.")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while not self.stopping.is_set():
+                    try:
+                        conn, _ = sock.accept()
+                    except socket.timeout:
+                        continue
+                    conn.settimeout(None)
+                    self.pending.acquire()
+                    pool.submit(self.handle, conn)
+            finally:
+                sock.close()
+                os.remove(self.socket_path)
+                print("Waiting for running requests to finish.")
+        print(f"Stopped after {self.requests} requests.")
+
+
+def main() -> None:
+    import pytemplates
+
+    Server(pytemplates.library()).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Layered settings, defaults, system, user and project files, environment, CLI
+#
+# File:     settings.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pickle
+import shlex
+import sys
+from typing import Dict, List, Tuple
+
+# Variables ------------------------------------------------------------------
+
+# Bump when the layout of the cached data changes
+CACHE_VERSION = 1
+
+# Directories kept in the cache, the least recently loaded is dropped
+CACHE_ENTRIES = 32
+
+CACHE_FILE = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "pyplate", "settings.pickle")
+
+SYSTEM_DIR = "/etc/pyplate"
+USER_DIR = os.path.join(os.getenv("XDG_CONFIG_HOME", os.path.expanduser("~/.config")), "pyplate")
+PROJECT_DIR = "pyplate"  # Relative to the current directory
+
+# Settings files of each directory, read in this order
+FILES = ("pyplate.conf", "pyplate.json")
+
+DEFAULTS = {
+    "author": "",
+    "email": "",
+    "org": "",
+    "license": "",
+    "project": "",
+    "project_description": "",
+}
+
+# Keys used in pyplate.json, pyplate.conf and the environment
+ALIASES = {
+    "AUTHOR": "author",
+    "EMAIL": "email",
+    "ORGANISATION": "org",
+    "PROJECT_NAME": "project",
+    "PROJECT_DESCRIPTION": "project_description",
+    "PROJECT_LICENSE": "license",
+    "PPL_NAME": "author",
+    "PPL_AUTHOR": "author",
+    "PPL_EMAIL": "email",
+    "PPL_ORG": "org",
+    "PPL_PROJECT": "project",
+    "PPL_DESCRIPTION": "project_description",
+    "PPL_LICENSE": "license",
+    "BP_NAME": "author",
+    "BP_EMAIL": "email",
+    "BP_ORG": "org",
+    "BP_LICENSE": "license",
+}
+
+# Command line arguments of the CLI layer, by key
+ARGS = {"author": "author", "email": "email", "org": "org", "project": "project"}
+
+# (path, mtime_ns, size) of a settings file, mtime_ns -1 if it does not exist
+FileSig = Tuple[str, int, int]
+
+
+# Code -----------------------------------------------------------------------
+class Settings:
+    """Merged settings, each value with the layer it came from
+
+    Layers in order of precedence, lowest first: defaults, system, user,
+    project, env and cli.
+    """
+
+    __slots__ = ("values", "sources")
+
+    def __init__(self, values: Dict[str, str], sources: Dict[str, str]) -> None:
+        self.values = values
+        self.sources = sources
+
+    def get(self, key: str, default: str = "") -> str:
+        return self.values.get(key, default)
+
+    def layer(self, name: str, values: Dict[str, str]) -> Settings:
+        """New settings with values of layer name on top"""
+        merged = dict(self.values)
+        sources = dict(self.sources)
+        for key, value in values.items():
+            merged[key] = value
+            sources[key] = name
+        return Settings(merged, sources)
+
+    def __repr__(self) -> str:
+        return f"Settings({self.values!r})"
+
+
+def normalize(data: Dict[str, object], origin: str) -> Dict[str, str]:
+    """Values of known keys, by canonical name"""
+    values = {}
+    for key, value in data.items():
+        name = ALIASES.get(key, key if key in DEFAULTS else None)
+        if name is None:
+            logging.debug(f"{origin}: ignoring unknown setting {key}")
+            continue
+        values[name] = str(value)
+    return values
+
+
+def parse_conf(text: str) -> Dict[str, str]:
+    """KEY="value" lines of a shell syntax file, comments and blank lines skipped"""
+    data = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        key, sep, value = line.partition("=")
+        if sep != "":
+            words = shlex.split(value)
+            data[key.strip()] = words[0] if len(words) > 0 else ""
+    return data
+
+
+def read_file(path: str) -> Dict[str, str]:
+    with open(path) as file:
+        text = file.read()
+    data = json.loads(text) if path.endswith(".json") else parse_conf(text)
+    return normalize(data, path)
+
+
+def candidates(cwd: str) -> List[Tuple[str, str]]:
+    """(layer, path) of all settings files, in order"""
+    dirs = [("system", SYSTEM_DIR), ("user", USER_DIR),
+            ("project", os.path.join(cwd, PROJECT_DIR))]
+    return [(layer, os.path.join(dir, name)) for layer, dir in dirs for name in FILES]
+
+
+def signature(path: str) -> FileSig:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (path, -1, 0)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _version() -> Tuple[int, int, int]:
+    return (CACHE_VERSION, sys.version_info[0], sys.version_info[1])
+
+
+def _load_cache(cache_file: str) -> dict | None:
+    try:
+        with open(cache_file, "rb") as file:
+            data = pickle.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # Corrupt or incompatible cache file
+        logging.debug(f"Discarding settings cache: {e}")
+        return None
+    if not isinstance(data, dict) or data.get("version") != _version():
+        return None
+    return data
+
+
+def _store_cache(cache_file: str, data: dict) -> None:
+    data["version"] = _version()
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_name = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_name, "wb") as file:
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, cache_file)
+    except OSError as e:
+        logging.debug(f"Could not write settings cache: {e}")
+
+
+def load_files(cwd: str, cache_file: str | None = CACHE_FILE) -> Settings:
+    """Defaults and file layers, from the compiled cache if no file changed
+
+    The cache is valid while every settings file, existing or not, has the
+    same mtime and size, so a cache hit costs one stat per candidate file
+    and no parsing.
+    """
+    files = candidates(cwd)
+    sigs = [signature(path) for _, path in files]
+
+    data = None
+    if cache_file is not None:
+        data = _load_cache(cache_file)
+        entry = None if data is None else data["entries"].get(cwd)
+        if entry is not None and entry["files"] == sigs:
+            return Settings(entry["values"], entry["sources"])
+
+    settings = Settings(dict(DEFAULTS), {key: "defaults" for key in DEFAULTS})
+    for (layer, path), sig in zip(files, sigs):
+        if sig[1] < 0:
+            continue
+        try:
+            settings = settings.layer(layer, read_file(path))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read settings file {path}: {e}")
+
+    if cache_file is not None:
+        entries = {} if data is None else data["entries"]
+        entries.pop(cwd, None)
+        entries[cwd] = {"files": sigs, "values": settings.values, "sources": settings.sources}
+        while len(entries) > CACHE_ENTRIES:
+            del entries[next(iter(entries))]
+        _store_cache(cache_file, {"entries": entries})
+    return settings
+
+
+def env_layer(environ=os.environ) -> Dict[str, str]:
+    """Settings given as environment variables, PPL_* before BP_*"""
+    values: Dict[str, str] = {}
+    for key in ALIASES:
+        if key.startswith("BP_") and key in environ:
+            values.setdefault(ALIASES[key], environ[key])
+    for key in ALIASES:
+        if key.startswith("PPL_") and key in environ:
+            values[ALIASES[key]] = environ[key]
+    return values
+
+
+def load(cwd: str | None = None, cache_file: str | None = CACHE_FILE) -> Settings:
+    """All layers but the CLI one"""
+    settings = load_files(os.getcwd() if cwd is None else cwd, cache_file)
+    return settings.layer("env", env_layer())
+
+
+# Settings of this process, loaded once by current()
+_current: Settings | None = None
+
+
+def current() -> Settings:
+    """Settings of this process, files are read and stat:ed only on first use"""
+    global _current
+    if _current is None:
+        _current = load()
+    return _current
+
+
+def apply_args(args) -> Settings:
+    """Put command line arguments on top of the current settings"""
+    global _current
+    values = {}
+    for key, attr in ARGS.items():
+        value = getattr(args, attr, None)
+        if value is not None:
+            values[key] = value
+    _current = current().layer("cli", values)
+    return _current
+
+
+def reload() -> Settings:
+    """Forget the settings of this process, the next current() loads them again"""
+    global _current
+    _current = None
+    return current()
+
+
+def main() -> None:
+    settings = current()
+    for key, value in settings.values.items():
+        print(f"{key:20} {value!r:40} {settings.sources[key]}")
+
+
+if __name__ == "__main__":
+    main()
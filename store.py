@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Content addressed store shared by generated files of all projects
+#
+# File:     store.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from enum import Enum
+from typing import Dict, Set
+
+from copier import CopyMode, copy_file
+
+# Variables ------------------------------------------------------------------
+
+STORE_DIR = os.getenv("PPL_STORE", os.path.join(
+    os.getenv("XDG_DATA_HOME", os.path.expanduser("~/.local/share")), "pyplate", "store"))
+
+OBJECTS_DIR = "objects"
+REFS_FILE = "refs.log"
+
+
+# Code -----------------------------------------------------------------------
+class StoreMode(Enum):
+    HARDLINK = "hardlink"  # Files share the stored read only inode
+    REFLINK = "reflink"  # Copy on write clones, a plain copy where not supported
+
+
+class ContentStore:
+    """Generated file contents by hash, placed as links or reflinks
+
+    The first file with some content and mode stores it as an object,
+    later identical files are linked to that object instead of written.
+    Every placed file is appended to a reference log, which is safe to
+    share between processes. gc() removes objects no file refers to.
+
+    Objects are stored without write permission, and hardlinked files
+    share that inode and mode, so an edit in place needs a chmod first.
+    Editors that save by writing a new file are fine. An object is checked
+    against its hash before it is reused, a changed one is stored again.
+    """
+
+    def __init__(self, dir: str = STORE_DIR, mode: StoreMode = StoreMode.REFLINK) -> None:
+        self.dir = dir
+        self.mode = mode
+        self.stored = 0
+        self.linked = 0
+
+    def key(self, digest: str, mode: int) -> str:
+        return f"{digest}.{mode & 0o7777:o}"
+
+    def object_path(self, key: str) -> str:
+        return os.path.join(self.dir, OBJECTS_DIR, key[:2], key)
+
+    def intact(self, key: str, path: str, size: int | None = None) -> bool:
+        """True if the file at path has the content of object key"""
+        try:
+            with open(path, "rb") as file:
+                if size is not None and os.fstat(file.fileno()).st_size != size:
+                    return False
+                return hashlib.sha256(file.read()).hexdigest() == key.partition(".")[0]
+        except OSError:
+            return False
+
+    def _store(self, key: str, data: bytes, mode: int, fsync: bool) -> str:
+        """Write object key, replacing a changed one"""
+        path = self.object_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".")
+        try:
+            os.fchmod(fd, mode & 0o7777 & ~0o222)  # Read only, shared by hardlinks
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+                if fsync:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+        self.stored += 1
+        return path
+
+    def _ref(self, key: str, file_name: str) -> None:
+        # Single small O_APPEND write, atomic between processes
+        line = f"{key}\t{os.path.abspath(file_name)}\n".encode()
+        fd = os.open(os.path.join(self.dir, REFS_FILE),
+                     os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def materialize(self, data: bytes, file_name: str, mode: int = 0o644,
+                    fsync: bool = False) -> os.stat_result:
+        """Place data at file_name through the store, atomically
+
+        Returns:
+            os.stat_result: Status of the placed file
+        """
+        key = self.key(hashlib.sha256(data).hexdigest(), mode)
+        path = self.object_path(key)
+        if self.intact(key, path, len(data)):
+            self.linked += 1
+            if os.stat(path).st_mode & 0o222:  # Stored before objects were read only
+                os.chmod(path, mode & 0o7777 & ~0o222)
+        else:
+            path = self._store(key, data, mode, fsync)
+
+        # Link or clone next to the target, then rename it into place
+        dir_name = os.path.dirname(os.path.abspath(file_name))
+        tmp_name = os.path.join(dir_name, f".{os.path.basename(file_name)}.{os.getpid()}.store")
+        if os.path.lexists(tmp_name):
+            os.remove(tmp_name)
+        copy_mode = CopyMode.HARDLINK if self.mode == StoreMode.HARDLINK else CopyMode.COPY
+        if copy_file(path, tmp_name, copy_mode) != "hardlink":
+            os.chmod(tmp_name, mode & 0o7777)
+        os.replace(tmp_name, file_name)
+
+        self._ref(key, file_name)
+        return os.stat(file_name)
+
+    def refs(self) -> Dict[str, Set[str]]:
+        """Referring files of each object, from the reference log"""
+        refs: Dict[str, Set[str]] = {}
+        try:
+            with open(os.path.join(self.dir, REFS_FILE)) as file:
+                for line in file:
+                    key, sep, path = line.rstrip("\n").partition("\t")
+                    if sep != "":
+                        refs.setdefault(key, set()).add(path)
+        except FileNotFoundError:
+            pass
+        return refs
+
+    def objects(self) -> Dict[str, str]:
+        """Path of every stored object by key"""
+        objects = {}
+        root = os.path.join(self.dir, OBJECTS_DIR)
+        if not os.path.isdir(root):
+            return objects
+        with os.scandir(root) as dirs:
+            for dir in dirs:
+                with os.scandir(dir.path) as entries:
+                    for entry in entries:
+                        if not entry.name.startswith("."):
+                            objects[entry.name] = entry.path
+        return objects
+
+    def is_live(self, key: str, path: str, object_st: os.stat_result,
+                object_intact: bool) -> bool:
+        """True if file at path still has the content of object key
+
+        A file linked to the object has its content, so it is live only if
+        the object itself is intact.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if (st.st_dev, st.st_ino) == (object_st.st_dev, object_st.st_ino):
+            return object_intact
+        return self.intact(key, path, object_st.st_size if object_intact else None)
+
+    def live_refs(self) -> Dict[str, Set[str]]:
+        """Reference count source, files still referring to each object"""
+        refs = self.refs()
+        live = {}
+        for key, path in self.objects().items():
+            object_st = os.stat(path)
+            object_intact = self.intact(key, path)
+            live[key] = {p for p in refs.get(key, set())
+                         if self.is_live(key, p, object_st, object_intact)}
+        return live
+
+    def gc(self) -> int:
+        """Remove unreferenced objects and compact the reference log
+
+        Returns:
+            int: Number of removed objects
+        """
+        if not os.path.isdir(self.dir):
+            return 0
+        live = self.live_refs()
+        removed = 0
+        for key, paths in live.items():
+            if len(paths) == 0:
+                os.remove(self.object_path(key))
+                removed += 1
+
+        tmp_name = os.path.join(self.dir, f"{REFS_FILE}.tmp")
+        with open(tmp_name, "w") as file:
+            for key, paths in sorted(live.items()):
+                for path in sorted(paths):
+                    file.write(f"{key}\t{path}\n")
+        os.replace(tmp_name, os.path.join(self.dir, REFS_FILE))
+        return removed
+
+    def stats(self) -> Dict[str, object]:
+        live = self.live_refs()
+        objects = self.objects()
+        size = sum(os.stat(path).st_size for path in objects.values())
+        refs = sum(len(paths) for paths in live.values())
+        return {"dir": self.dir,
+                "objects": len(objects),
+                "bytes": size,
+                "refs": refs,
+                "saved": sum(os.stat(objects[k]).st_size * (len(p) - 1)
+                             for k, p in live.items() if len(p) > 1),
+                "garbage": sum(1 for paths in live.values() if len(paths) == 0)}
+
+    def summary(self) -> str:
+        return f"{self.stored} objects stored, {self.linked} files linked from store."
+
+
+def main() -> None:
+    for key, value in ContentStore().stats().items():
+        print(f"{key:10} {value}")
+
+
+if __name__ == "__main__":
+    main()
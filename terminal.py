@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Terminal output, colour tables, buffered message sink and progress line
+#
+# File:     terminal.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import atexit
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from typing import IO, Iterator, List
+
+# Variables ------------------------------------------------------------------
+
+# 256 colour escape sequences, indexed by colour number
+FG_256 = tuple(f"\x1b[38;5;{c}m" for c in range(256))
+BG_256 = tuple(f"\x1b[48;5;{c}m" for c in range(256))
+
+CLEAR_LINE = "\r\x1b[K"
+
+
+# Code -----------------------------------------------------------------------
+def use_colour(stream: IO[str] = sys.stdout) -> bool:
+    """True if escape codes should be written to stream
+
+    NO_COLOR turns colours off and FORCE_COLOR on, otherwise stream must be
+    a terminal other than a dumb one.
+    """
+    if os.getenv("NO_COLOR", "") != "":
+        return False
+    if os.getenv("FORCE_COLOR", "") != "":
+        return True
+    try:
+        is_tty = stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+    return is_tty and os.getenv("TERM", "") != "dumb"
+
+
+class Sink:
+    """Collects message lines and writes them to the stream in one write
+
+    Unbuffered, each line is written directly. Within buffered() lines
+    are kept until max_lines are pending, flush() or the end of the
+    block. Lines are also flushed at exit.
+    """
+
+    def __init__(self, stream: IO[str] | None = None, max_lines: int = 256) -> None:
+        self._stream = stream
+        self.max_lines = max_lines
+        self.lines: List[str] = []
+        self.depth = 0  # Nesting of buffered() blocks
+        atexit.register(self.flush)
+
+    @property
+    def stream(self) -> IO[str]:
+        return sys.stdout if self._stream is None else self._stream
+
+    def write(self, line: str) -> None:
+        if self.depth == 0:
+            self.stream.write(line + "\n")
+            return
+        self.lines.append(line)
+        if len(self.lines) >= self.max_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self.lines) > 0:
+            lines, self.lines = self.lines, []
+            self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+    def take(self) -> List[str]:
+        """Pending lines, removed from the sink, for writing elsewhere"""
+        lines, self.lines = self.lines, []
+        return lines
+
+    @contextmanager
+    def buffered(self) -> Iterator[None]:
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                self.flush()
+
+
+class Progress:
+    """Single line progress display, redrawn at most every interval seconds
+
+    Only drawn on a terminal. Lines written with line() are printed above
+    the progress line.
+    """
+
+    def __init__(self, total: int, stream: IO[str] | None = None,
+                 interval: float = 0.1) -> None:
+        self.total = total
+        self.stream = sys.stderr if stream is None else stream
+        self.interval = interval
+        self.enabled = use_colour(self.stream)
+        self.done = 0
+        self.last = 0.0
+        self.start = time.perf_counter()
+        self.text = ""
+
+    def update(self, done: int, text: str = "") -> None:
+        self.done = done
+        self.text = text
+        now = time.perf_counter()
+        if self.enabled and (now - self.last >= self.interval or done == self.total):
+            self.last = now
+            self.draw()
+
+    def draw(self) -> None:
+        seconds = time.perf_counter() - self.start
+        rate = self.done / seconds if seconds > 0 else 0.0
+        width = shutil.get_terminal_size().columns
+        status = f"[{self.done}/{self.total}] {rate:.1f}/s {self.text}"
+        self.stream.write(CLEAR_LINE + status[:width - 1])
+        self.stream.flush()
+
+    def line(self, text: str) -> None:
+        if self.enabled:
+            self.stream.write(CLEAR_LINE)
+        self.stream.write(text + "\n")
+        if self.enabled:
+            self.draw()
+
+    def close(self) -> None:
+        if self.enabled:
+            self.stream.write(CLEAR_LINE)
+            self.stream.flush()
+
+
+# Message sink of Bp
+sink = Sink()
+
+
+def main() -> None:
+    colour = use_colour()
+    print(f"Colour: {colour}")
+    for c in range(0, 256, 16):
+        print("".join(f"{FG_256[i] if colour else ''}{i:4}" for i in range(c, c + 16))
+              + ("\x1b[m" if colour else ""))
+
+    progress = Progress(200)
+    with sink.buffered():
+        for i in range(200):
+            sink.write(f"Message {i}")
+            progress.update(i + 1, f"item {i}")
+            time.sleep(0.005)
+    progress.close()
+
+
+if __name__ == "__main__":
+    main()
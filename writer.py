@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------------
+#
+# Atomic file writer for generated output
+#
+# File:     writer.py
+# Author:   Peter Malmberg  <peter.malmberg@gmail.com>
+# Org:
+# Date:     2026-10-18
+# License:
+# Python:   >= 3.0
+#
+# ----------------------------------------------------------------------------
+
+# Imports --------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+from enum import Enum
+from typing import TYPE_CHECKING, Iterable, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from store import ContentStore
+
+# Code -----------------------------------------------------------------------
+
+
+class Sync(Enum):
+    NEVER = "never"  # Leave flushing to the OS
+    BATCH = "batch"  # fsync all files of a run at commit()
+    ALWAYS = "always"  # fsync every file before it is renamed into place
+
+
+class AtomicWriter:
+    """Writes files through a temporary file that is renamed into place
+
+    The temporary file is created in the target directory with the final
+    mode, so a crash leaves either the old file or the new one, never a
+    half written file. With Sync.BATCH, files are kept pending until
+    commit(), which syncs all of them before renaming, and then syncs each
+    touched directory once. A writer may be shared by threads.
+
+    With a content store set, files are placed through the store instead,
+    identical files become links to one stored object.
+    """
+
+    def __init__(self, sync: Sync = Sync.NEVER, max_pending: int = 256) -> None:
+        self.sync = sync
+        self.max_pending = max_pending
+        self.pending: List[Tuple[int, str, str]] = []
+        self.lock = threading.Lock()
+        self.files = 0
+        self.bytes = 0
+        self.store: ContentStore | None = None
+
+    def write(self, file_name: str, chunks: Iterable[str],
+              mode: int = 0o644) -> os.stat_result:
+        """Write text chunks to file_name
+
+        Returns:
+            os.stat_result: Status of the new file, also when it is still
+            pending
+        """
+        if self.store is not None:
+            data = b"".join(chunk.encode() for chunk in chunks)
+            st = self.store.materialize(data, file_name, mode, self.sync != Sync.NEVER)
+            with self.lock:
+                self.files += 1
+                self.bytes += len(data)
+            return st
+
+        dir_name = os.path.dirname(os.path.abspath(file_name))
+        fd, tmp_name = tempfile.mkstemp(dir=dir_name,
+                                        prefix=f".{os.path.basename(file_name)}.")
+        try:
+            os.fchmod(fd, mode)  # Final mode, not limited by umask
+            size = 0
+            with os.fdopen(fd, "wb", closefd=False) as file:
+                for chunk in chunks:
+                    size += file.write(chunk.encode())
+            st = os.fstat(fd)
+        except BaseException:
+            os.close(fd)
+            os.remove(tmp_name)
+            raise
+
+        with self.lock:
+            self.files += 1
+            self.bytes += size
+            if self.sync == Sync.BATCH:
+                self.pending.append((fd, tmp_name, file_name))
+                full = len(self.pending) >= self.max_pending
+
+        if self.sync == Sync.BATCH:
+            if full:
+                self.commit()
+            return st
+
+        if self.sync == Sync.ALWAYS:
+            os.fsync(fd)
+        os.close(fd)
+        os.replace(tmp_name, file_name)
+        if self.sync == Sync.ALWAYS:
+            self._sync_dirs({dir_name})
+        return st
+
+    @staticmethod
+    def _sync_dirs(dirs: Set[str]) -> None:
+        for dir_name in dirs:
+            fd = os.open(dir_name, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def commit(self) -> None:
+        """Sync and move all pending files into place"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+        dirs = set()
+        for fd, tmp_name, file_name in pending:
+            os.fsync(fd)
+            os.close(fd)
+        for fd, tmp_name, file_name in pending:
+            os.replace(tmp_name, file_name)
+            dirs.add(os.path.dirname(os.path.abspath(file_name)))
+        self._sync_dirs(dirs)
+
+    def abort(self, file_name: str | None = None) -> None:
+        """Drop all pending files, or only the one of file_name"""
+        with self.lock:
+            if file_name is None:
+                pending, self.pending = self.pending, []
+            else:
+                path = os.path.abspath(file_name)
+                pending = [p for p in self.pending if os.path.abspath(p[2]) == path]
+                self.pending = [p for p in self.pending if p not in pending]
+        for fd, tmp_name, _ in pending:
+            os.close(fd)
+            os.remove(tmp_name)
+
+    def summary(self) -> str:
+        return f"{self.files} files, {self.bytes} bytes written."
+
+
+# Shared writer of a ppl run
+writer = AtomicWriter()
+
+
+def main() -> None:
+    w = AtomicWriter(Sync.BATCH)
+    w.write("writer_test.txt", ["Hello ", "world\n"], 0o640)
+    w.commit()
+    print(w.summary())
+
+
+if __name__ == "__main__":
+    main()